@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章记录与倒排索引
+Article：紧凑的文章信息（__slots__），标签、日期等重复出现的字符串只保留一份；
+支持 article['title'] 这样的字典式读取，页面生成代码不需要区分。
+ArticleIndex：标签映射为整数编号，每个标签、每个年份一个有序的文章编号数组（array('I')，每篇 4 字节），
+索引大小与文章的标签总数成正比；多个标签的交集、"某标签某年的文章"等查询从最短的数组出发，
+在其余数组中二分查找。
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+
+# 字段顺序与 extract_markdown_info / extract_article_info 返回的字典一致
+FIELDS = ('slug', 'title', 'date', 'abstract', 'tags', 'categories', 'path', 'source_file', 'type')
+
+
+class Article:
+    """一篇文章的信息；值为 None 的字段视为不存在（旧版 HTML 文章没有分类、源文件和类型）"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, slug, title, date, abstract, tags=(), categories=None, path=None,
+                 source_file=None, type=None):
+        self.slug = slug
+        self.title = title
+        self.date = sys.intern(date)
+        self.abstract = abstract
+        self.tags = tuple(sys.intern(tag) for tag in tags)
+        self.categories = tuple(sys.intern(c) for c in categories) if categories is not None else None
+        self.path = path
+        self.source_file = source_file
+        self.type = sys.intern(type) if type is not None else None
+
+    @classmethod
+    def from_dict(cls, info):
+        """由解析得到的文章信息字典创建"""
+        return cls(**{field: info[field] for field in FIELDS if field in info})
+
+    def to_dict(self):
+        """转换为字典（用于保存为 JSON），列表字段还原为 list"""
+        info = {}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                info[field] = list(value) if isinstance(value, tuple) else value
+        return info
+
+    def __getitem__(self, field):
+        value = getattr(self, field, None)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def __contains__(self, field):
+        return getattr(self, field, None) is not None
+
+    def __eq__(self, other):
+        if not isinstance(other, Article):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in FIELDS)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Article({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in FIELDS)
+
+    def __setstate__(self, state):
+        for field, value in zip(FIELDS, state):
+            setattr(self, field, value)
+
+
+def compact_article(info):
+    """把文章信息字典转换为 Article，None 原样返回"""
+    if info is None or isinstance(info, Article):
+        return info
+    return Article.from_dict(info)
+
+
+def _intersect(postings):
+    """多个有序编号数组的交集（从最短的出发，在其余数组中二分查找）"""
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        matched = array('I')
+        lo = 0
+        for i in result:
+            lo = bisect_left(other, i, lo)
+            if lo == len(other):
+                break
+            if other[lo] == i:
+                matched.append(i)
+        result = matched
+        if not result:
+            break
+    return result
+
+
+class ArticleIndex:
+    """按标签、年份查询的倒排索引，文章按传入顺序编号，查询结果保持该顺序"""
+
+    def __init__(self, articles):
+        self.articles = list(articles)
+        self.tag_ids = {}
+        self.tag_names = []
+        self._tag_postings = []
+        self._year_postings = {}
+        for i, article in enumerate(self.articles):
+            for tag in article['tags']:
+                tag_id = self.tag_ids.get(tag)
+                if tag_id is None:
+                    tag_id = self.tag_ids[tag] = len(self.tag_names)
+                    self.tag_names.append(tag)
+                    self._tag_postings.append(array('I'))
+                postings = self._tag_postings[tag_id]
+                # 同一篇文章重复的标签只记录一次
+                if not postings or postings[-1] != i:
+                    postings.append(i)
+            year = article['date'][:4]
+            postings = self._year_postings.get(year)
+            if postings is None:
+                postings = self._year_postings[year] = array('I')
+            postings.append(i)
+
+    def match(self, tags=(), year=None):
+        """同时带有 tags 中所有标签（且发表于 year 年）的文章编号（有序数组）"""
+        postings = []
+        for tag in tags:
+            tag_id = self.tag_ids.get(tag)
+            if tag_id is None:
+                return array('I')
+            postings.append(self._tag_postings[tag_id])
+        if year is not None:
+            year_postings = self._year_postings.get(f"{year:04d}" if isinstance(year, int) else year)
+            if year_postings is None:
+                return array('I')
+            postings.append(year_postings)
+        if not postings:
+            return array('I', range(len(self.articles)))
+        return _intersect(postings)
+
+    def select(self, tags=(), year=None):
+        """符合条件的文章列表"""
+        articles = self.articles
+        return [articles[i] for i in self.match(tags, year)]
+
+    def count(self, tags=(), year=None):
+        return len(self.match(tags, year))
+
+    def tag_counts(self):
+        """{标签: 文章数}"""
+        return {tag: len(self._tag_postings[tag_id]) for tag, tag_id in self.tag_ids.items()}
+
+    def year_counts(self):
+        """{年份: 文章数}"""
+        return {year: len(postings) for year, postings in self._year_postings.items()}
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章元数据库（SQLite）
+保存每个源文件的大小、修改时间、内容哈希（HTML 文章）和解析出的文章信息（slug、标题、日期、标签、分类、摘要、路径），
+以及标签页面的内容指纹。update_blog.py 扫描时增量更新，页面生成时按标签、年份、最新 N 篇走索引查询；
+导入脚本据此知道哪些文章已经存在，并在其中记录导入过的笔记（内容哈希和生成的文章目录）。
+
+用法：
+python3 article_store.py                 # 统计信息
+python3 article_store.py --tag Python    # 某个标签下的文章
+python3 article_store.py --year 2024     # 某一年的文章
+python3 article_store.py --tag Python --tag 部署 --year 2024   # 组合条件（交集）
+python3 article_store.py --latest 10     # 最新的 10 篇
+"""
+
+import json
+import sqlite3
+import argparse
+from pathlib import Path
+
+from article_index import Article, ArticleIndex, compact_article
+
+DEFAULT_DB_FILE = Path(".build_cache") / "articles.db"
+
+# 表结构变化时递增，旧数据库会被清空重建（相当于一次全量构建）
+SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE articles (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT,
+    slug TEXT,
+    title TEXT,
+    date TEXT,
+    path TEXT,
+    info TEXT
+);
+CREATE INDEX articles_date ON articles (date DESC, slug DESC);
+CREATE INDEX articles_path ON articles (path);
+CREATE INDEX articles_hash ON articles (hash);
+
+CREATE TABLE article_tags (
+    tag TEXT NOT NULL,
+    article_id INTEGER NOT NULL,
+    PRIMARY KEY (tag, article_id)
+) WITHOUT ROWID;
+CREATE INDEX article_tags_article ON article_tags (article_id);
+
+CREATE TABLE tag_pages (
+    tag TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+
+CREATE TABLE imported_notes (
+    source TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    duplicate_of TEXT
+);
+CREATE INDEX imported_notes_hash ON imported_notes (hash);
+"""
+
+# 与 update_blog.scan_articles 的排序一致：日期新的在前，相同日期按 slug 倒序
+_ORDER = "ORDER BY a.date DESC, a.slug DESC, a.source"
+
+# IN (...) 查询每次最多带的参数个数（SQLite 默认上限 999）
+_QUERY_BATCH = 900
+
+
+class ArticleStore:
+    """文章元数据库"""
+
+    def __init__(self, db_file=DEFAULT_DB_FILE):
+        self.db_file = Path(db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_file)
+        self._init_schema()
+        # 最近一次写入数据库的清单内容，写入时只更新有变化的行
+        self._written_sources = {}
+        self._written_tags = {}
+        # 源文件 → 文章信息（Article），查询时不再重复解析 JSON；本对象写入某行时同步更新
+        self._decoded = {}
+
+    def _init_schema(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        with self.conn:
+            for table in ('articles', 'article_tags', 'tag_pages', 'imported_notes'):
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.executescript(_SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    # ---------- 构建清单 ----------
+
+    def load_manifest(self):
+        """读出构建清单：{'sources': {源文件: {size, mtime_ns, hash, info}}, 'tags': {标签: 指纹}}"""
+        sources = {}
+        for source, size, mtime_ns, digest, info in self.conn.execute(
+                "SELECT source, size, mtime_ns, hash, info FROM articles"):
+            sources[source] = {
+                'size': size,
+                'mtime_ns': mtime_ns,
+                'hash': digest,
+                'info': self._decode(source, info),
+            }
+        tags = dict(self.conn.execute("SELECT tag, fingerprint FROM tag_pages"))
+        self._written_sources = dict(sources)
+        self._written_tags = dict(tags)
+        return {'version': SCHEMA_VERSION, 'sources': sources, 'tags': tags}
+
+    def write_manifest(self, manifest):
+        """把清单的变化写入数据库（不提交，页面生成期间的查询能看到新数据）"""
+        if self._written_sources is None:
+            raise RuntimeError("流式写入过数据库，需要先调用 load_manifest")
+        sources = manifest['sources']
+        written = self._written_sources
+        removed = [key for key in written if key not in sources]
+        changed = [key for key, entry in sources.items() if written.get(key) != entry]
+
+        self._delete_rows(removed)
+        self._replace_rows({key: sources[key] for key in changed})
+        self._written_sources = dict(sources)
+
+        tags = manifest.get('tags', {})
+        if tags != self._written_tags:
+            self.replace_tag_fingerprints(tags)
+
+    def save_manifest(self, manifest):
+        """写入清单的变化并提交"""
+        self.write_manifest(manifest)
+        self.conn.commit()
+
+    def commit(self):
+        self.conn.commit()
+
+    def _delete_rows(self, keys):
+        for key in keys:
+            self._decoded.pop(key, None)
+        stale = [(key,) for key in keys]
+        self.conn.executemany("DELETE FROM article_tags WHERE article_id = "
+                              "(SELECT id FROM articles WHERE source = ?)", stale)
+        self.conn.executemany("DELETE FROM articles WHERE source = ?", stale)
+
+    def _replace_rows(self, entries):
+        """写入 {源文件: 清单条目}，已有的行先删除"""
+        self._delete_rows(entries)
+        for key, entry in entries.items():
+            cursor = self.conn.execute(
+                "INSERT INTO articles (source, size, mtime_ns, hash, slug, title, date, path, info) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._article_row(key, entry))
+            if entry['info']:
+                self.conn.executemany("INSERT OR IGNORE INTO article_tags (tag, article_id) VALUES (?, ?)",
+                                      [(tag, cursor.lastrowid) for tag in entry['info']['tags']])
+                self._decoded[key] = compact_article(entry['info'])
+
+    def replace_tag_fingerprints(self, tags):
+        """替换全部标签页指纹 {标签: 指纹}"""
+        self.conn.execute("DELETE FROM tag_pages")
+        self.conn.executemany("INSERT INTO tag_pages (tag, fingerprint) VALUES (?, ?)", tags.items())
+        self._written_tags = dict(tags)
+
+    # ---------- 流式构建（不在内存中保留整个清单） ----------
+
+    def load_entries(self, keys):
+        """读出一批源文件的清单条目 {源文件: 条目}，不在数据库中的源文件不包含在结果里"""
+        entries = {}
+        for start in range(0, len(keys), _QUERY_BATCH):
+            batch = keys[start:start + _QUERY_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            for source, size, mtime_ns, digest, info in self.conn.execute(
+                    f"SELECT source, size, mtime_ns, hash, info FROM articles WHERE source IN ({placeholders})",
+                    batch):
+                entries[source] = {
+                    'size': size,
+                    'mtime_ns': mtime_ns,
+                    'hash': digest,
+                    'info': compact_article(json.loads(info)) if info is not None else None,
+                }
+        return entries
+
+    def update_entries(self, entries, previous):
+        """写入一批清单条目中与 previous 不同的部分（不提交）"""
+        self._replace_rows({key: entry for key, entry in entries.items() if previous.get(key) != entry})
+        # 内存中的清单副本已经过时，之后需要重新 load_manifest
+        self._written_sources = None
+
+    def begin_sweep(self):
+        """开始记录本次扫描到的源文件（记在临时表中）"""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen_sources (source TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM temp.seen_sources")
+
+    def mark_seen(self, keys):
+        self.conn.executemany("INSERT OR IGNORE INTO temp.seen_sources (source) VALUES (?)",
+                              [(key,) for key in keys])
+
+    def sweep_unseen(self):
+        """删除本次扫描没有见到的源文件，返回它们（已排序）"""
+        removed = [row[0] for row in self.conn.execute(
+            "SELECT source FROM articles WHERE source NOT IN (SELECT source FROM temp.seen_sources) "
+            "ORDER BY source")]
+        self._delete_rows(removed)
+        self.conn.execute("DELETE FROM temp.seen_sources")
+        return removed
+
+    def tag_fingerprints(self):
+        return dict(self.conn.execute("SELECT tag, fingerprint FROM tag_pages"))
+
+    @staticmethod
+    def _article_row(key, entry):
+        info = entry['info']
+        if info is None:
+            return (key, entry['size'], entry['mtime_ns'], entry['hash'], None, None, None, None, None)
+        if isinstance(info, Article):
+            info = info.to_dict()
+        return (key, entry['size'], entry['mtime_ns'], entry['hash'],
+                info['slug'], info['title'], info['date'], info['path'],
+                json.dumps(info, ensure_ascii=False))
+
+    # ---------- 批量导入 ----------
+
+    def imported_notes(self):
+        """批量导入过的笔记：{笔记路径: (大小, 修改时间, 内容哈希, 文章 slug, 内容相同的笔记或 None)}"""
+        return {row[0]: row[1:] for row in self.conn.execute(
+            "SELECT source, size, mtime_ns, hash, slug, duplicate_of FROM imported_notes")}
+
+    def record_imported_notes(self, rows):
+        """写入一批 (笔记路径, 大小, 修改时间, 内容哈希, 文章 slug, 内容相同的笔记) 记录（不提交）"""
+        self.conn.executemany("INSERT OR REPLACE INTO imported_notes "
+                              "(source, size, mtime_ns, hash, slug, duplicate_of) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    # ---------- 查询 ----------
+
+    def _decode(self, source, info):
+        if info is None:
+            return None
+        article = self._decoded.get(source)
+        if article is None:
+            article = self._decoded[source] = Article.from_dict(json.loads(info))
+        return article
+
+    def _articles(self, sql, params=()):
+        """执行查询（结果列为 source, info），返回文章信息（Article）列表"""
+        return [self._decode(source, info) for source, info in self.conn.execute(sql, params)]
+
+    def all(self):
+        """所有文章（已排序）"""
+        return self._articles(f"SELECT a.source, a.info FROM articles a WHERE a.info IS NOT NULL {_ORDER}")
+
+    def latest(self, limit):
+        """最新的 limit 篇文章"""
+        return self._articles(f"SELECT a.source, a.info FROM articles a WHERE a.info IS NOT NULL {_ORDER} LIMIT ?",
+                              (limit,))
+
+    def by_tag(self, tag):
+        """某个标签下的所有文章（已排序）"""
+        return self._articles(f"SELECT a.source, a.info FROM article_tags t JOIN articles a ON a.id = t.article_id "
+                              f"WHERE t.tag = ? AND a.info IS NOT NULL {_ORDER}", (tag,))
+
+    def by_year(self, year):
+        """某一年发表的所有文章（已排序）"""
+        return self._articles(f"SELECT a.source, a.info FROM articles a WHERE a.date >= ? AND a.date < ? {_ORDER}",
+                              (f"{year:04d}", f"{year + 1:04d}"))
+
+    def find_by_path(self, path):
+        """按文章路径（如 ./post/slug/）查找，返回 (源文件, 文章信息) 或 None"""
+        row = self.conn.execute("SELECT source, info FROM articles WHERE path = ? AND info IS NOT NULL",
+                                (path,)).fetchone()
+        return (row[0], self._decode(*row)) if row else None
+
+    def tag_counts(self):
+        """{标签: 文章数}，按标签排序"""
+        return dict(self.conn.execute(
+            "SELECT tag, COUNT(*) FROM article_tags GROUP BY tag ORDER BY tag"))
+
+    def year_counts(self):
+        """{年份: 文章数}，新的在前"""
+        return dict(self.conn.execute(
+            "SELECT substr(date, 1, 4) AS year, COUNT(*) FROM articles WHERE info IS NOT NULL "
+            "GROUP BY year ORDER BY year DESC"))
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM articles WHERE info IS NOT NULL").fetchone()[0]
+
+
+_default_store = None
+
+
+def get_article_store():
+    """进程内共享的默认文章元数据库"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ArticleStore()
+    return _default_store
+
+
+def print_articles(articles):
+    for article in articles:
+        print(f"  {article['date']}  {article['title']}  {article['path']}")
+    print(f"共 {len(articles)} 篇")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查询文章元数据库（先运行 update_blog.py 生成）")
+    parser.add_argument('--tag', action='append',
+                        help="列出某个标签下的文章（可以重复，列出同时带有这些标签的文章）")
+    parser.add_argument('--year', type=int, help="列出某一年的文章")
+    parser.add_argument('--latest', type=int, metavar='N', help="列出最新的 N 篇文章")
+    args = parser.parse_args()
+
+    store = get_article_store()
+    if len(args.tag or []) + bool(args.year) > 1:
+        # 组合条件在各标签、年份的有序编号数组中求交集（从最短的数组出发，在其余数组中二分查找）
+        index = ArticleIndex(store.all())
+        print_articles(index.select(args.tag or (), args.year))
+    elif args.tag:
+        print_articles(store.by_tag(args.tag[0]))
+    elif args.year:
+        print_articles(store.by_year(args.year))
+    elif args.latest:
+        print_articles(store.latest(args.latest))
+    else:
+        print(f"📚 共 {store.count()} 篇文章")
+        print("📅 按年份：" + "，".join(f"{year} 年 {n} 篇" for year, n in store.year_counts().items()))
+        tag_counts = sorted(store.tag_counts().items(), key=lambda item: item[1], reverse=True)
+        print(f"🏷️ 共 {len(tag_counts)} 个标签，最常用：" + "，".join(f"{tag}({n})" for tag, n in tag_counts[:10]))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
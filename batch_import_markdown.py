@@ -7,55 +7,189 @@
 import os
 import re
 import json
+import time
+import hashlib
+import tarfile
+import zipfile
+import argparse
 import datetime
+from collections import deque
 from pathlib import Path
 
-def batch_import_markdown(notes_directory, config_file=None):
+from output_writer import write_text, write_summary, record_read
+from render_cache import get_render_cache
+from article_store import get_article_store
+from create_article_template import check_existing_article
+from page_templates import SIMPLE_PAGE, SIMPLE_POST
+from page_jobs import PagePool
+from import_index import ImportIndex
+from note_sources import open_notes, is_archive
+
+# 两次进度报告之间至少间隔的秒数
+PROGRESS_INTERVAL = 2.0
+
+# 流式读取的 tar 包笔记数未知，按这个数估计任务分批的大小
+ESTIMATED_ARCHIVE_NOTES = 1024
+
+def batch_import_markdown(notes_directory, config_file=None, jobs=1, force=False, verbose=True):
     """
     批量导入 Markdown 笔记
     
     Args:
-        notes_directory: 包含 Markdown 文件的目录
+        notes_directory: 包含 Markdown 文件的目录，或导出笔记的压缩包（.zip、.tar、.tar.gz 等，不解压直接读取）
         config_file: 配置文件路径（可选）
+        jobs: 并行生成文章的进程数（1 表示在本进程中依次生成）
+        force: 为 True 时重新生成所有笔记（仍然沿用已经分配的 slug）
+        verbose: 是否逐篇输出导入结果（失败的笔记总会输出）
     """
     
     if not os.path.exists(notes_directory):
         print(f"错误：目录 {notes_directory} 不存在")
         return False
+    if not os.path.isdir(notes_directory) and not is_archive(notes_directory):
+        print(f"错误：{notes_directory} 不是目录，也不是支持的压缩包（.zip、.tar、.tar.gz、.tgz、.tar.bz2、.tar.xz）")
+        return False
     
     # 加载配置
     config = load_config(config_file) if config_file else {}
     
-    # 查找所有 Markdown 文件
-    markdown_files = []
-    for root, dirs, files in os.walk(notes_directory):
-        for file in files:
-            if file.endswith(('.md', '.markdown')):
-                markdown_files.append(os.path.join(root, file))
+    # 查找所有 Markdown 文件（按路径排序，slug 冲突时按这个顺序编号；tar 包按包内顺序流式读取）
+    try:
+        notes, total = open_notes(notes_directory)
+    except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+        print(f"错误：无法读取 {notes_directory}: {e}")
+        return False
     
-    print(f"找到 {len(markdown_files)} 个 Markdown 文件")
+    if total is None:
+        print(f"从压缩包 {notes_directory} 中流式读取 Markdown 文件")
+    else:
+        print(f"找到 {total} 个 Markdown 文件")
     
-    # 处理每个文件
-    success_count = 0
-    for md_file in markdown_files:
-        try:
-            # 从文件名或内容中提取信息
-            title = extract_title_from_file(md_file)
-            date = extract_date_from_file(md_file)
-            tags = extract_tags_from_file(md_file)
+    index = ImportIndex(get_article_store())
+    counts = {'unchanged': 0, 'duplicate': 0, 'failed': 0}
+    progress = ImportProgress(total)
+    cache = get_render_cache()
+    # 已经交给进程池、还没有取回结果的笔记
+    dispatched = deque()
+    
+    def render_tasks():
+        """在本进程中依次读取笔记（每篇只读一次）、计算内容哈希、分配 slug，产出需要生成文章的任务"""
+        for note in notes:
+            source = note.source
+            if not force and index.is_unchanged(source, note.size, note.mtime_ns):
+                counts['unchanged'] += 1
+                progress.advance(0)
+                continue
+            content = note.read()
+            if content is None:
+                counts['failed'] += 1
+                print(f"❌ 处理失败: {note.name}（无法读取文件）")
+                progress.advance(note.size)
+                continue
+            digest = content_hash(content)
+            if not force and index.same_content(source, digest):
+                # 只是修改时间变了
+                index.record(source, note.size, note.mtime_ns, digest, index.notes[source][3],
+                             index.notes[source][4])
+                counts['unchanged'] += 1
+                progress.advance(note.size)
+                continue
+            original = index.find_original(source, digest)
+            if original is not None:
+                other, slug = original
+                removed = index.record(source, note.size, note.mtime_ns, digest, slug, other)
+                counts['duplicate'] += 1
+                print(f"🔗 {note.name} 与 {other} 内容相同，指向已有文章 post/{slug}/")
+                if removed:
+                    print(f"🗑️ 删除 {note.name} 原来的文章 post/{removed}/")
+                progress.advance(note.size)
+                continue
             
-            # 创建文章
-            if create_article_from_markdown(md_file, title, date, tags):
-                success_count += 1
-                print(f"✅ 成功处理: {title}")
+            title, date, tags = extract_note_info(note.name, content, note.mtime)
+            slug = index.assign_slug(source, article_slug_from_title(title))
+            index.claim_content(source, digest)
+            dispatched.append((note, digest, slug))
+            yield import_note, (note.name, title, date, tags, content, slug)
+    
+    # 生成文章（jobs 大于 1 时由多个进程并行生成），每批结果取回后提交一次索引
+    success_count = 0
+    try:
+        with PagePool(jobs) as pool:
+            tasks = pool.imap(render_tasks(), count=ESTIMATED_ARCHIVE_NOTES if total is None else total)
+            for title, ok, error in tasks:
+                note, digest, slug = dispatched.popleft()
+                if ok:
+                    success_count += 1
+                    removed = index.record(note.source, note.size, note.mtime_ns, digest, slug)
+                    if verbose:
+                        print(f"✅ 成功处理: {title}")
+                    if removed:
+                        print(f"🗑️ 标题已改变，删除原来的文章 post/{removed}/（现在是 post/{slug}/）")
+                else:
+                    counts['failed'] += 1
+                    print(f"❌ 处理 {note.name} 时出错: {error}" if error else f"❌ 处理失败: {note.name}")
+                if progress.advance(note.size):
+                    index.flush()
+    except KeyboardInterrupt:
+        print(f"\n⏸️  导入已中断：已处理 {progress.position()} 个文件，"
+              f"再次导入同一目录（压缩包）时会从中断的地方继续")
+        raise
+    finally:
+        index.flush()
+    
+    progress.finish()
+    print(f"\n🎉 批量导入完成！生成 {success_count} 篇文章，跳过未变化的 {counts['unchanged']} 篇，"
+          f"内容重复 {counts['duplicate']} 篇，失败 {counts['failed']} 篇（共 {progress.done} 个文件）")
+    print(cache.summary())
+    print(write_summary())
+    return counts['failed'] < progress.done
+
+class ImportProgress:
+    """导入进度和吞吐量报告（每隔 PROGRESS_INTERVAL 秒输出一次）；total 为 None 时（流式读取的 tar 包）不估计剩余时间"""
+    
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self._reported = self.started
+    
+    def advance(self, size):
+        """处理完一个文件（size 为读取的字节数），输出了进度时返回 True"""
+        self.done += 1
+        self.bytes += size
+        now = time.perf_counter()
+        if now - self._reported >= PROGRESS_INTERVAL and (self.total is None or self.done < self.total):
+            self._reported = now
+            rate = self.done / (now - self.started)
+            if self.total is None:
+                print(f"⏳ 已处理 {self.done} 个文件（{self.bytes / 1024 / 1024:.1f}MB），每秒 {rate:.0f} 个文件")
             else:
-                print(f"❌ 处理失败: {md_file}")
-                
-        except Exception as e:
-            print(f"❌ 处理 {md_file} 时出错: {e}")
+                remaining = (self.total - self.done) / rate
+                print(f"⏳ 已处理 {self.position()}（{self.done * 100 / self.total:.1f}%），"
+                      f"每秒 {rate:.0f} 个文件，预计还需 {remaining:.0f} 秒")
+            return True
+        return False
     
-    print(f"\n🎉 批量导入完成！成功处理 {success_count}/{len(markdown_files)} 个文件")
-    return success_count > 0
+    def position(self):
+        """已处理的文件数（总数已知时为 "已处理/总数"）"""
+        return str(self.done) if self.total is None else f"{self.done}/{self.total}"
+    
+    def finish(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print(f"📊 处理 {self.done} 个文件（{self.bytes / 1024 / 1024:.1f}MB），用时 {elapsed:.1f} 秒，"
+              f"每秒 {self.done / elapsed:.0f} 个文件，{self.bytes / 1024 / 1024 / elapsed:.1f}MB/s")
+
+def import_note(md_file, title, date, tags, content, slug):
+    """生成一篇笔记的文章（批量导入的任务，可以在工作进程中执行）
+
+    返回 (标题, 是否成功, 出错信息)；工作进程中的渲染缓存命中次数由 PagePool 汇总
+    """
+    try:
+        ok = create_article_from_markdown(md_file, title, date, tags, content, slug)
+        return title, ok, None
+    except Exception as e:
+        return title, False, str(e)
 
 def load_config(config_file):
     """加载配置文件"""
@@ -65,65 +199,89 @@ def load_config(config_file):
     with open(config_file, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def extract_title_from_file(file_path):
-    """从文件路径或内容中提取标题"""
-    # 从文件名提取
-    filename = os.path.basename(file_path)
-    title = os.path.splitext(filename)[0]
-    
-    # 尝试从文件内容中提取标题
+def read_note(file_path):
+    """读取整篇笔记，读取失败时返回 None"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
-            # 查找第一个 # 标题
-            match = re.search(r'^# (.+)$', content, re.MULTILINE)
-            if match:
-                return match.group(1).strip()
-    except:
-        pass
-    
-    return title
+            record_read(os.fstat(f.fileno()).st_size)
+        return content
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def extract_note_info(file_path, content, mtime=None):
+    """从已经读取的笔记内容中提取 (标题, 日期, 标签)，不再重复读取文件
+
+    mtime 为笔记的修改时间（秒），内容中没有日期时使用；为 None 时取 file_path 的修改时间
+    """
+    return (title_from_content(file_path, content),
+            date_from_content(file_path, content, mtime),
+            tags_from_content(content))
+
+def extract_title_from_file(file_path):
+    """从文件路径或内容中提取标题"""
+    return title_from_content(file_path, read_note(file_path))
 
 def extract_date_from_file(file_path):
     """从文件内容中提取日期"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # 查找日期格式 YYYY-MM-DD
-            match = re.search(r'(\d{4}-\d{2}-\d{2})', content)
-            if match:
-                return match.group(1)
-    except:
-        pass
+    return date_from_content(file_path, read_note(file_path))
+
+def extract_tags_from_file(file_path):
+    """从文件内容中提取标签"""
+    return tags_from_content(read_note(file_path))
+
+def title_from_content(file_path, content):
+    """从笔记内容（为 None 时只用文件名）中提取标题"""
+    # 查找第一个 # 标题
+    if content is not None:
+        match = re.search(r'^# (.+)$', content, re.MULTILINE)
+        if match:
+            return match.group(1).strip()
+    
+    # 从文件名提取
+    filename = os.path.basename(file_path)
+    return os.path.splitext(filename)[0]
+
+def date_from_content(file_path, content, mtime=None):
+    """从笔记内容中提取日期，找不到时使用文件修改时间（压缩包中的笔记由 mtime 传入）"""
+    # 查找日期格式 YYYY-MM-DD
+    if content is not None:
+        match = re.search(r'(\d{4}-\d{2}-\d{2})', content)
+        if match:
+            return match.group(1)
     
     # 使用文件修改时间
-    mtime = os.path.getmtime(file_path)
+    if mtime is None:
+        mtime = os.path.getmtime(file_path)
     return datetime.datetime.fromtimestamp(mtime).strftime('%Y-%m-%d')
 
-def extract_tags_from_file(file_path):
-    """从文件内容中提取标签"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # 查找标签行
-            match = re.search(r'^tags?:\s*(.+)$', content, re.MULTILINE | re.IGNORECASE)
-            if match:
-                return [tag.strip() for tag in match.group(1).split(',')]
-    except:
-        pass
+def tags_from_content(content):
+    """从笔记内容中提取标签"""
+    # 查找标签行
+    if content is not None:
+        match = re.search(r'^tags?:\s*(.+)$', content, re.MULTILINE | re.IGNORECASE)
+        if match:
+            return [tag.strip() for tag in match.group(1).split(',')]
     
     return []
 
-def create_article_from_markdown(markdown_file, title, date, tags):
-    """创建文章（简化版）"""
+def create_article_from_markdown(markdown_file, title, date, tags, markdown_content=None, article_slug=None):
+    """创建文章（简化版）
+
+    已经读取过的内容通过 markdown_content 传入，不再重复读取；
+    article_slug 为 None 时由标题生成，路径已被其他源文件占用时放弃
+    """
     try:
         # 读取 Markdown 内容
-        with open(markdown_file, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
+        if markdown_content is None:
+            with open(markdown_file, 'r', encoding='utf-8') as f:
+                markdown_content = f.read()
         
         # 创建文章目录
-        article_slug = re.sub(r'[^\w\s-]', '', title.lower())
-        article_slug = re.sub(r'[-\s]+', '-', article_slug)
+        if article_slug is None:
+            article_slug = article_slug_from_title(title)
+            if not check_existing_article(article_slug):
+                return False
         article_dir = f"post/{article_slug}"
         os.makedirs(article_dir, exist_ok=True)
         
@@ -132,68 +290,57 @@ def create_article_from_markdown(markdown_file, title, date, tags):
         
         # 写入文件
         html_file = os.path.join(article_dir, 'index.html')
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        write_text(html_file, html_content)
         
         return True
     except Exception as e:
         print(f"创建文章时出错: {e}")
         return False
 
+def article_slug_from_title(title):
+    """由标题生成文章目录名（slug）；标题中没有可用字符时为 untitled"""
+    article_slug = re.sub(r'[^\w\s-]', '', title.lower())
+    return re.sub(r'[-\s]+', '-', article_slug) or 'untitled'
+
+def content_hash(content):
+    """笔记内容的哈希（用于跳过未变化的笔记、发现内容重复的笔记）"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
 def generate_simple_html(title, date, content, tags):
     """生成简化的 HTML"""
-    # 简单的 Markdown 转换
-    html_content = content.replace('\n', '<br>\n')
-    
-    return f"""<!DOCTYPE html>
-<html>
-  <head>
-    <meta charset="utf-8">
-    <title>{title} | Gridea</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1, maximum-scale=1, user-scalable=no">
-    <link rel="stylesheet" href="../../styles/main.css">
-  </head>
-  <body>
-    <div class="main">
-      <div class="sidebar">
-        <div class="top-container">
-          <div class="top-header-container">
-            <a class="site-title-container" href="/">
-              <h1 class="site-title">Gridea</h1>
-            </a>
-          </div>
-          <div>
-            <a href="/" class="site-nav">首页</a>
-            <a href="/archives" class="site-nav">归档</a>
-            <a href="/tags" class="site-nav">标签</a>
-            <a href="/post/about" class="site-nav">关于</a>
-          </div>
-        </div>
-      </div>
-      
-      <div class="main-container">
-        <div class="content-container">
-          <div class="post-detail">
-            <h2 class="post-title">{title}</h2>
-            <div class="post-date">{date}</div>
-            <div class="post-content">
-              {html_content}
-            </div>
-          </div>
-        </div>
-      </div>
-    </div>
-  </body>
-</html>"""
-
-def main():
+    # Markdown 转换
+    html_content = get_render_cache().render(content)
+    
+    return SIMPLE_PAGE.render(title=title, logo='',
+                              content=SIMPLE_POST.render(title=title, date=date, content=html_content))
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="批量导入 Markdown 笔记到 Gridea 博客")
+    parser.add_argument('notes_directory', nargs='?',
+                        help="包含 Markdown 文件的目录，或导出笔记的 zip / tar(.gz) 压缩包（不指定时提示输入）")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="并行生成文章的进程数（默认：CPU 核数，1 表示串行）")
+    parser.add_argument('--force', action='store_true',
+                        help="重新生成所有笔记的文章（默认跳过上次导入后没有变化的笔记）")
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help="不逐篇输出导入成功的笔记，只输出进度")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """主函数"""
+    args = parse_args(argv)
     print("📝 批量导入 Markdown 笔记到 Gridea 博客")
     print("=" * 50)
     
-    notes_dir = input("请输入包含 Markdown 文件的目录路径: ").strip()
+    notes_dir = args.notes_directory or input("请输入包含 Markdown 文件的目录（或压缩包）路径: ").strip()
     
-    if batch_import_markdown(notes_dir):
+    try:
+        imported = batch_import_markdown(notes_dir, jobs=max(1, args.jobs), force=args.force,
+                                         verbose=not args.quiet)
+    except KeyboardInterrupt:
+        raise SystemExit(130)
+    if imported:
         print("\n🎉 批量导入完成！")
         print("\n接下来您需要：")
         print("1. 检查生成的文章是否正确")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+博客构建性能测试
+生成指定篇数的合成博客（中英文混排、front matter、代码块、表格、旧版 HTML 文章及嵌套目录、大量标签），
+分别测量 scan_articles、parse_front_matter、markdown_to_html、update_tags、update_rss 的耗时、
+吞吐量和内存峰值，结果保存为 JSON，方便在不同提交之间对比。
+
+用法：
+python3 benchmark_build.py                          # 默认 100 / 1000 / 10000 / 50000 篇
+python3 benchmark_build.py --sizes 100 1000         # 指定规模
+python3 benchmark_build.py --compare old.json       # 与之前的结果对比
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+import platform
+import tempfile
+import contextlib
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+import update_blog
+from create_article_template import markdown_to_html, generate_article_html
+from render_cache import get_render_cache
+from front_matter import parse_front_matter
+from article_store import ArticleStore
+from page_regions import start_marker, end_marker
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+RESULTS_DIR = Path(".build_cache") / "benchmarks"
+RESULTS_VERSION = 1
+
+# 文章类型比例：Markdown、旧版 HTML（post/<slug>/index.html）、嵌套 HTML（post/<slug>/<sub>/index.html）
+KIND_WEIGHTS = {'markdown': 80, 'html': 12, 'nested': 8}
+TAG_POOL_SIZE = 300
+
+CHINESE_WORDS = ["服务器", "配置", "性能", "缓存", "数据库", "网络", "代理", "部署", "监控", "日志",
+                 "学习", "笔记", "总结", "问题", "方案", "优化", "测试", "自动化", "容器", "脚本"]
+ENGLISH_WORDS = ["server", "config", "latency", "cache", "python", "nginx", "docker", "build",
+                 "index", "query", "thread", "memory", "kernel", "proxy", "deploy", "vector"]
+
+SITE_TEMPLATE = """<!DOCTYPE html>
+<html>
+  <head><meta charset="utf-8"><title>Gridea</title><link rel="stylesheet" href="{root}styles/main.css"></head>
+  <body>
+    <div class="main-container">
+      {body}
+    </div>
+  </body>
+</html>
+"""
+
+LEGACY_TEMPLATE = """<!DOCTYPE html>
+<html>
+  <head><meta charset="utf-8"><title>{title} | Gridea</title><meta name="keywords" content="{keywords}"></head>
+  <body>
+    <div class="post-detail">
+      <h2 class="post-title">{title}</h2>
+      <div class="post-date">{date}</div>
+      <div class="post-content">
+{content}
+      </div>
+      <div class="tag-container">
+{tags}
+      </div>
+    </div>
+  </body>
+</html>
+"""
+
+
+def build_tag_pool(rng):
+    """中英文混合的标签池"""
+    tags = []
+    for i in range(TAG_POOL_SIZE):
+        if i % 2:
+            tags.append(f"{rng.choice(CHINESE_WORDS)}{i}")
+        else:
+            tags.append(f"{rng.choice(ENGLISH_WORDS)}-{i}")
+    return tags
+
+
+def sentence(rng):
+    """一句中英文混排的文字"""
+    words = []
+    for _ in range(rng.randint(6, 14)):
+        words.append(rng.choice(CHINESE_WORDS) if rng.random() < 0.6 else rng.choice(ENGLISH_WORDS))
+    return "".join(w if w[0] >= '\u4e00' else f" {w} " for w in words).strip() + "。"
+
+
+def paragraph(rng):
+    text = "".join(sentence(rng) for _ in range(rng.randint(2, 5)))
+    if rng.random() < 0.3:
+        text += f" 参考 [{rng.choice(ENGLISH_WORDS)}](https://example.com/{rng.randint(1, 999)}) 和 **{rng.choice(CHINESE_WORDS)}**。"
+    return text
+
+
+def markdown_body(rng, title):
+    """Markdown 正文：标题、段落、列表、代码块，部分文章带表格和引用"""
+    parts = [f"# {title}", paragraph(rng)]
+    for _ in range(rng.randint(1, 4)):
+        parts.append(f"## {sentence(rng)[:-1]}")
+        parts.append(paragraph(rng))
+        if rng.random() < 0.5:
+            parts.append("\n".join(f"- {sentence(rng)}" for _ in range(rng.randint(2, 5))))
+        if rng.random() < 0.5:
+            lines = [f"    {rng.choice(ENGLISH_WORDS)}_{i} = {rng.randint(0, 9999)}  # `{rng.choice(CHINESE_WORDS)}`"
+                     for i in range(rng.randint(3, 12))]
+            parts.append("```python\ndef main():\n" + "\n".join(lines) + "\n```")
+        if rng.random() < 0.15:
+            rows = [f"| {rng.choice(ENGLISH_WORDS)} | {rng.randint(1, 100)} | {rng.choice(CHINESE_WORDS)} |"
+                    for _ in range(rng.randint(2, 6))]
+            parts.append("| 名称 | 数值 | 说明 |\n|:---|---:|:---:|\n" + "\n".join(rows))
+        if rng.random() < 0.15:
+            parts.append(f"> {sentence(rng)}")
+    return "\n\n".join(parts) + "\n"
+
+
+def generate_corpus(root, count, seed=0):
+    """在 root 目录下生成 count 篇文章和构建所需的页面模板，返回各类文章数量"""
+    rng = random.Random(seed)
+    root = Path(root)
+    post_dir = root / "post"
+    post_dir.mkdir(parents=True, exist_ok=True)
+    tag_pool = build_tag_pool(rng)
+    # 标签使用频率近似 Zipf 分布：少数热门标签，大量冷门标签
+    tag_weights = [1 / (i + 1) for i in range(len(tag_pool))]
+    start = datetime.date(2012, 1, 1)
+
+    kinds = list(KIND_WEIGHTS)
+    counts = dict.fromkeys(kinds, 0)
+    for i in range(count):
+        kind = rng.choices(kinds, weights=list(KIND_WEIGHTS.values()))[0]
+        counts[kind] += 1
+        title = f"{sentence(rng)[:rng.randint(6, 20)].strip()} {i}"
+        date = (start + datetime.timedelta(days=rng.randint(0, 365 * 13))).isoformat()
+        tags = list(dict.fromkeys(rng.choices(tag_pool, weights=tag_weights, k=rng.randint(1, 6))))
+
+        if kind == 'markdown':
+            front_matter = [
+                "---",
+                f"title: {title}",
+                f"tags: [{', '.join(tags)}]",
+                f"categories: [{rng.choice(CHINESE_WORDS)}]",
+                f"date: {date} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+            ]
+            if rng.random() < 0.5:
+                front_matter.append(f"excerpt: \"{sentence(rng)}\"")
+            front_matter.append("---")
+            text = "\n".join(front_matter) + "\n\n" + markdown_body(rng, title)
+            (post_dir / f"post-{i:06d}.md").write_text(text, encoding='utf-8')
+        else:
+            content = "\n".join(f"<p>{paragraph(rng)}</p>" for _ in range(rng.randint(2, 8)))
+            html = LEGACY_TEMPLATE.format(
+                title=title, date=date, content=content,
+                keywords=",".join(tags),
+                tags="\n".join(f'<a href="#"><span class="tag">{tag}</span></a>' for tag in tags))
+            article_dir = post_dir / f"legacy-{i:06d}"
+            if kind == 'nested':
+                article_dir = article_dir / f"{rng.choice(ENGLISH_WORDS)}-{rng.randint(1, 99)}"
+            article_dir.mkdir(parents=True, exist_ok=True)
+            (article_dir / "index.html").write_text(html, encoding='utf-8')
+
+    # 构建脚本读取的页面模板（只包含需要替换的生成区域，标记见 page_regions.py）
+    templates = {
+        "index.html": ('./', '<div class="content-container" data-aos="fade-up">'
+                             f'{start_marker("posts")}{end_marker("posts")}</div>'),
+        "archives/index.html": ('../', f'{start_marker("archives")}{end_marker("archives")}'),
+        "tags/index.html": ('../', f'{start_marker("tags")}{end_marker("tags")}'),
+    }
+    for name, (prefix, body) in templates.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(SITE_TEMPLATE.format(root=prefix, body=body), encoding='utf-8')
+    return counts
+
+
+def measure(func, memory=True):
+    """运行 func 两次：第一次计时（墙钟和 CPU 时间），第二次用 tracemalloc 统计内存峰值"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        func()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                func()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return wall, cpu, peak
+
+
+def run_size(count, seed=0, memory=True):
+    """生成 count 篇文章的合成博客并运行各项测试，返回结果列表"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="blog-bench-") as root:
+        generate_started = time.perf_counter()
+        counts = generate_corpus(root, count, seed)
+        print(f"🧪 {count} 篇：生成耗时 {time.perf_counter() - generate_started:.1f}s "
+              f"（Markdown {counts['markdown']}，HTML {counts['html']}，嵌套 {counts['nested']}）")
+
+        cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            markdown_files = sorted(Path("post").glob("*.md"))
+            documents = [path.read_text(encoding='utf-8') for path in markdown_files]
+            bodies = [document.split('---', 2)[-1] for document in documents]
+            # 标签页和 RSS 从文章元数据库查询，先把扫描结果写入本次的临时数据库
+            manifest = {'sources': {}, 'tags': {}}
+            articles = update_blog.scan_articles(manifest, verbose=False)
+            store = ArticleStore()
+            store.save_manifest(manifest)
+            cache = get_render_cache()
+
+            def render_cold():
+                cache.clear()
+                for body in bodies:
+                    markdown_to_html(body)
+
+            def render_warm():
+                for body in bodies:
+                    markdown_to_html(body)
+
+            def render_pages():
+                # 渲染结果已缓存，主要测量套用文章页面布局的速度
+                for body in bodies:
+                    generate_article_html("标题", "2024-01-01", body, ["Python", "部署"], "摘要", "slug")
+
+            benchmarks = [
+                ('scan_articles', len(articles), lambda: update_blog.scan_articles(verbose=False)),
+                ('parse_front_matter', len(documents),
+                 lambda: [parse_front_matter(document) for document in documents]),
+                ('markdown_to_html', len(bodies), render_cold),
+                ('markdown_to_html (cached)', len(bodies), render_warm),
+                ('article_pages', len(bodies), render_pages),
+                ('update_tags', len(articles), lambda: update_blog.update_tags(store)),
+                ('update_rss', len(articles), lambda: update_blog.update_rss(store)),
+                # 流式全量构建（含页面和搜索索引），内存峰值应不随文章数增长
+                ('stream_site', len(articles), lambda: update_blog.stream_site(store, full=True)),
+            ]
+            for name, items, func in benchmarks:
+                wall, cpu, peak = measure(func, memory)
+                result = {
+                    'size': count,
+                    'benchmark': name,
+                    'items': items,
+                    'seconds': round(wall, 6),
+                    'cpu_seconds': round(cpu, 6),
+                    'items_per_second': round(items / wall, 1) if wall else None,
+                    'peak_memory_bytes': peak,
+                }
+                results.append(result)
+                print_result(result)
+            store.close()
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def print_result(result, baseline=None):
+    line = (f"   {result['benchmark']:<28}{result['seconds'] * 1000:>11.1f}ms"
+            f"{result['items_per_second'] or 0:>14.0f}/s")
+    if result['peak_memory_bytes'] is not None:
+        line += f"{result['peak_memory_bytes'] / 1024 / 1024:>10.1f}MB"
+    if baseline:
+        ratio = result['seconds'] / baseline['seconds'] if baseline['seconds'] else 0
+        line += f"   {ratio:.2f}x（之前 {baseline['seconds'] * 1000:.1f}ms）"
+    print(line)
+
+
+def git_commit():
+    """当前提交的短哈希，不在 git 仓库中时返回 None"""
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, check=True)
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_file):
+    """与之前保存的结果对比（比值小于 1 表示更快）"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['size'], r['benchmark']): r for r in baseline['results']}
+    print(f"\n📊 与 {baseline_file}（提交 {baseline.get('commit') or '未知'}）对比：")
+    for size in sorted({r['size'] for r in results}):
+        print(f"🧪 {size} 篇")
+        for result in results:
+            if result['size'] == size:
+                print_result(result, previous.get((size, result['benchmark'])))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="合成博客的构建性能测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"文章篇数（默认：{' '.join(map(str, DEFAULT_SIZES))}）")
+    parser.add_argument('--seed', type=int, default=0, help="随机种子，相同种子生成相同的文章")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="不统计内存峰值（跳过 tracemalloc 的第二次运行）")
+    parser.add_argument('--output', '-o', type=Path,
+                        help=f"结果 JSON 文件（默认：{RESULTS_DIR}/<时间>-<提交>.json）")
+    parser.add_argument('--compare', type=Path, help="与之前保存的结果 JSON 对比")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("⏱️  开始构建性能测试...")
+    print(f"   {'测试项':<25}{'耗时':>13}{'吞吐量':>12}{'内存峰值':>8}")
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args.seed, memory=not args.no_memory))
+
+    commit = git_commit()
+    report = {
+        'version': RESULTS_VERSION,
+        'commit': commit,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': results,
+    }
+    output = args.output
+    if output is None:
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = RESULTS_DIR / f"{stamp}-{commit or 'nogit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 结果已保存到 {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建过程性能分析（update_blog.py --profile）
+记录每个阶段的墙钟时间、CPU 时间和内存峰值，每个源文件的解析耗时，以及读写字节数；
+输出可读的表格和 JSON 报告。未开启时 profile_phase 等函数不做任何事。
+"""
+
+import os
+import sys
+import json
+import time
+import datetime
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from output_writer import get_write_stats
+
+REPORT_VERSION = 1
+DEFAULT_TOP_N = 10
+
+_active = None
+
+
+def _cpu_time():
+    """本进程及已结束子进程（并行解析的工作进程）的 CPU 时间"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class BuildProfiler:
+    """一次构建的性能记录"""
+
+    def __init__(self, top_n=DEFAULT_TOP_N):
+        self.top_n = top_n
+        self.phases = []
+        self.parse_times = []
+        self.peak_memory = 0
+        self._wall_start = time.perf_counter()
+        self._cpu_start = _cpu_time()
+        self._io_start = get_write_stats()
+
+    @contextmanager
+    def phase(self, name):
+        """记录一个阶段的耗时和内存峰值"""
+        tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_time()
+        try:
+            yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            self.peak_memory = max(self.peak_memory, peak)
+            self.phases.append({
+                'name': name,
+                'wall_seconds': time.perf_counter() - wall_start,
+                'cpu_seconds': _cpu_time() - cpu_start,
+                'peak_memory_bytes': peak,
+            })
+
+    def record_parse_time(self, source, seconds, size):
+        self.parse_times.append((source, seconds, size))
+
+    def report(self):
+        """JSON 报告内容"""
+        stats = get_write_stats()
+        io_stats = {key: stats[key] - self._io_start.get(key, 0) for key in stats}
+        slowest = sorted(self.parse_times, key=lambda item: item[1], reverse=True)[:self.top_n]
+        return {
+            'version': REPORT_VERSION,
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'argv': sys.argv[1:],
+            'total': {
+                'wall_seconds': time.perf_counter() - self._wall_start,
+                'cpu_seconds': _cpu_time() - self._cpu_start,
+                'peak_memory_bytes': max(self.peak_memory, tracemalloc.get_traced_memory()[1]),
+            },
+            'phases': self.phases,
+            'parse': {
+                'files': len(self.parse_times),
+                'total_seconds': sum(seconds for _, seconds, _ in self.parse_times),
+                'slowest': [{'source': source, 'seconds': seconds, 'bytes': size}
+                            for source, seconds, size in slowest],
+            },
+            'io': {
+                'bytes_read': io_stats['bytes_read'],
+                'bytes_written': io_stats['bytes_written'],
+                'files_written': io_stats['written'],
+                'files_skipped': io_stats['skipped'],
+            },
+        }
+
+
+def format_report(report):
+    """把报告格式化为表格"""
+    lines = ["", "⏱️  性能分析", "-" * 64,
+             f"{'阶段':<22}{'墙钟(ms)':>10}{'CPU(ms)':>12}{'内存峰值(MB)':>10}"]
+    for phase in report['phases']:
+        lines.append(f"{phase['name']:<24}{phase['wall_seconds'] * 1000:>12.1f}"
+                     f"{phase['cpu_seconds'] * 1000:>12.1f}"
+                     f"{phase['peak_memory_bytes'] / 1024 / 1024:>14.2f}")
+    total = report['total']
+    lines.append(f"{'总计':<22}{total['wall_seconds'] * 1000:>12.1f}{total['cpu_seconds'] * 1000:>12.1f}"
+                 f"{total['peak_memory_bytes'] / 1024 / 1024:>14.2f}")
+    lines.append("-" * 64)
+
+    parse = report['parse']
+    lines.append(f"📄 解析 {parse['files']} 个源文件，合计 {parse['total_seconds'] * 1000:.1f}ms")
+    if parse['slowest']:
+        lines.append(f"   最慢的 {len(parse['slowest'])} 个：")
+        for item in parse['slowest']:
+            lines.append(f"   {item['seconds'] * 1000:>9.2f}ms  {item['bytes'] / 1024:>8.1f}KB  {item['source']}")
+
+    io_stats = report['io']
+    lines.append(f"💽 读取 {io_stats['bytes_read'] / 1024:.1f}KB，写入 {io_stats['bytes_written'] / 1024:.1f}KB"
+                 f"（写入 {io_stats['files_written']} 个文件，跳过 {io_stats['files_skipped']} 个）")
+    lines.append("   CPU 时间包含并行解析的子进程；内存峰值只统计主进程；tracemalloc 会使各阶段耗时偏高")
+    return "\n".join(lines)
+
+
+def start_profiling(top_n=DEFAULT_TOP_N):
+    """开始记录（同时启动 tracemalloc）"""
+    global _active
+    tracemalloc.start()
+    _active = BuildProfiler(top_n)
+    return _active
+
+
+def finish_profiling(output_file):
+    """结束记录，输出表格并保存 JSON 报告"""
+    global _active
+    if _active is None:
+        return None
+    report = _active.report()
+    _active = None
+    tracemalloc.stop()
+
+    print(format_report(report))
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📊 性能报告已保存到 {output_file}")
+    return report
+
+
+def profiling_enabled():
+    return _active is not None
+
+
+@contextmanager
+def profile_phase(name):
+    """开启 --profile 时记录该阶段，否则什么也不做"""
+    if _active is None:
+        yield
+        return
+    with _active.phase(name):
+        yield
+
+
+def record_parse_time(source, seconds, size):
+    """记录单个源文件的解析耗时"""
+    if _active is not None:
+        _active.record_parse_time(source, seconds, size)
@@ -10,6 +10,11 @@ import re
 import datetime
 from pathlib import Path
 
+from output_writer import write_text
+from render_cache import get_render_cache
+from article_store import get_article_store
+from page_templates import ARTICLE_PAGE, ARTICLE_TAGS, ARTICLE_TAG_LINK
+
 def create_article_from_markdown(markdown_file, title, date=None, tags=None, description=None):
     """
     从 Markdown 文件创建 Gridea 文章
@@ -43,6 +48,8 @@ def create_article_from_markdown(markdown_file, title, date=None, tags=None, des
     article_slug = re.sub(r'[^\w\s-]', '', title.lower())
     article_slug = re.sub(r'[-\s]+', '-', article_slug)
     article_dir = f"post/{article_slug}"
+    if not check_existing_article(article_slug):
+        return False
     
     # 创建目录
     os.makedirs(article_dir, exist_ok=True)
@@ -52,187 +59,48 @@ def create_article_from_markdown(markdown_file, title, date=None, tags=None, des
     
     # 写入 HTML 文件
     html_file = os.path.join(article_dir, 'index.html')
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    write_text(html_file, html_content)
     
     print(f"✅ 文章创建成功：{html_file}")
+    print(get_render_cache().summary())
+    return True
+
+def check_existing_article(article_slug):
+    """查询文章元数据库：路径已被其他源文件（如 post/ 下的 Markdown 文章）占用时返回 False"""
+    source = str(Path("post") / article_slug / "index.html")
+    existing = get_article_store().find_by_path(f"./post/{article_slug}/")
+    if existing is None:
+        return True
+    existing_source, existing_info = existing
+    if existing_source != source:
+        print(f"⚠️  路径 post/{article_slug}/ 已被 {existing_source}（{existing_info['title']}）使用，跳过")
+        return False
+    print(f"🔁 覆盖已有文章：{existing_info['title']}")
     return True
 
 def generate_article_html(title, date, content, tags, description, article_slug):
     """生成文章 HTML 内容"""
     
-    # 将 Markdown 转换为 HTML（简单转换）
+    # 将 Markdown 转换为 HTML
     html_content = markdown_to_html(content)
-    
+    return render_article_page(title, date, html_content, tags, description)
+
+def render_article_page(title, date, html_content, tags, description):
+    """把已经转换好的文章 HTML 套入文章页面布局"""
     # 生成标签 HTML
     tags_html = ""
     if tags:
-        tags_html = f"""
-              <div class="tag-container">
-                {''.join([f'<a href="../../tag/{tag}/" class="tag">{tag}</a>' for tag in tags])}
-              </div>"""
+        tags_html = ARTICLE_TAGS.render(links=[ARTICLE_TAG_LINK.render(tag=tag) for tag in tags])
     
-    return f"""<!DOCTYPE html>
-<html>
-  <head>
-    <meta charset="utf-8" >
-
-<title>{title} | Gridea</title>
-
-<meta name="viewport" content="width=device-width, initial-scale=1, maximum-scale=1, user-scalable=no">
-
-<link rel="stylesheet" href="https://use.fontawesome.com/releases/v5.7.2/css/all.css" integrity="sha384-fnmOCqbTlWIlj8LyTjo7mOUStjsKC4pOpQbqyi7RrhN7udi9RwhKkMHpvLbHG9Sr" crossorigin="anonymous">
-<link rel="shortcut icon" href="../../favicon.ico?v=1659011765580">
-<link rel="stylesheet" href="../../styles/main.css">
-
-
-
-<link rel="stylesheet" href="https://unpkg.com/aos@next/dist/aos.css" />
-<script src="https://cdn.jsdelivr.net/npm/vue/dist/vue.js"></script>
-
-
-
-    <meta name="description" content="{description}" />
-    <meta name="keywords" content="{', '.join(tags)}" />
-  </head>
-  <body>
-    <div id="app" class="main">
-
-      <div class="sidebar" :class="{{ 'full-height': menuVisible }}">
-  <div class="top-container" data-aos="fade-right">
-    <div class="top-header-container">
-      <a class="site-title-container" href="/">
-        <img src="../../images/avatar.png?v=1659011765580" class="site-logo">
-        <h1 class="site-title">Gridea</h1>
-      </a>
-      <div class="menu-btn" @click="menuVisible = !menuVisible">
-        <div class="line"></div>
-      </div>
-    </div>
-    <div>
-      
-        
-          <a href="/" class="site-nav">
-            首页
-          </a>
-        
-      
-        
-          <a href="/archives" class="site-nav">
-            归档
-          </a>
-        
-      
-        
-          <a href="/tags" class="site-nav">
-            标签
-          </a>
-        
-      
-        
-          <a href="/post/about" class="site-nav">
-            关于
-          </a>
-        
-      
-    </div>
-  </div>
-  <div class="bottom-container" data-aos="flip-up" data-aos-offset="0">
-    <div class="social-container">
-      
-        
-      
-        
-      
-        
-      
-        
-      
-        
-      
-    </div>
-    <div class="site-description">
-      温故而知新
-    </div>
-    <div class="site-footer">
-      Powered by <a href="https://github.com/getgridea/gridea" target="_blank">Gridea</a> | <a class="rss" href="../../atom.xml" target="_blank">RSS</a>
-    </div>
-  </div>
-</div>
-
-
-      <div class="main-container">
-        <div class="content-container" data-aos="fade-up">
-          <div class="post-detail">
-            <h2 class="post-title">{title}</h2>
-            <div class="post-date">{date}</div>
-            
-            <div class="post-content" v-pre>
-              {html_content}
-            </div>
-            
-            {tags_html}
-            
-
-            
-
-          </div>
-
-        </div>
-      </div>
-    </div>
-
-    <script src="https://unpkg.com/aos@next/dist/aos.js"></script>
-<script type="application/javascript">
-
-AOS.init();
-
-var app = new Vue({{
-  el: '#app',
-  data: {{
-    menuVisible: false,
-  }},
-}})
-
-</script>
-
-
-
-
-  </body>
-</html>"""
+    return ARTICLE_PAGE.render(title=title, date=date, description=description,
+                               keywords=', '.join(tags), content=html_content, tags=tags_html)
 
 def markdown_to_html(markdown_content):
-    """简单的 Markdown 到 HTML 转换"""
-    # 这里可以集成更强大的 Markdown 解析器，如 markdown 库
-    # 现在使用简单的正则表达式转换
-    
-    # 转换标题
-    html = re.sub(r'^# (.+)$', r'<h1>\1</h1>', markdown_content, flags=re.MULTILINE)
-    html = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-    html = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
-    
-    # 转换粗体和斜体
-    html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
-    html = re.sub(r'\*(.+?)\*', r'<em>\1</em>', html)
-    
-    # 转换链接
-    html = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', html)
-    
-    # 转换代码块
-    html = re.sub(r'```([^`]+)```', r'<pre><code>\1</code></pre>', html, flags=re.DOTALL)
-    html = re.sub(r'`([^`]+)`', r'<code>\1</code>', html)
-    
-    # 转换段落
-    paragraphs = html.split('\n\n')
-    html_paragraphs = []
-    for p in paragraphs:
-        p = p.strip()
-        if p and not p.startswith('<'):
-            p = f'<p>{p}</p>'
-        html_paragraphs.append(p)
-    
-    return '\n\n'.join(html_paragraphs)
+    """Markdown 到 HTML 转换（单遍扫描，支持代码块、列表、引用、表格、图片）
+
+    相同内容的渲染结果会从磁盘渲染缓存中读取
+    """
+    return get_render_cache().render(markdown_content)
 
 def main():
     """主函数 - 示例用法"""
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式构建用的排序工具
+ExternalSorter：外部排序，记录攒够一批就排序后写入临时文件，读取时用 heapq.merge 归并，
+内存中最多只有一批记录；TopK：只保留键最大的 k 条记录（小顶堆）。
+两者都按键从大到小输出，与页面上文章从新到旧的顺序一致；键和值需要能序列化为 JSON。
+"""
+
+import json
+import heapq
+import shutil
+import tempfile
+from operator import itemgetter
+from pathlib import Path
+
+# 每个临时文件（一段有序记录）的记录数
+DEFAULT_RUN_SIZE = 10000
+
+_first = itemgetter(0)
+
+# 复用编码器（json.dumps 带参数时每次都会新建编码器）
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+class ExternalSorter:
+    """磁盘上的外部排序"""
+
+    def __init__(self, directory, run_size=DEFAULT_RUN_SIZE):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = Path(tempfile.mkdtemp(prefix="sort-", dir=directory))
+        self.run_size = run_size
+        self.count = 0
+        self._buffer = []
+        self._runs = []
+
+    def add(self, key, value):
+        self._buffer.append((key, value))
+        self.count += 1
+        if len(self._buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        """把缓冲区排序后写入一个临时文件"""
+        if not self._buffer:
+            return
+        self._buffer.sort(key=_first, reverse=True)
+        run_file = self.directory / f"{len(self._runs)}.jsonl"
+        with open(run_file, 'w', encoding='utf-8') as f:
+            for record in self._buffer:
+                f.write(_encode(record))
+                f.write('\n')
+        self._runs.append(run_file)
+        self._buffer = []
+
+    def __iter__(self):
+        """按键从大到小产出 (键, 值)；可以多次遍历"""
+        if not self._runs:
+            # 记录不多时不落盘
+            self._buffer.sort(key=_first, reverse=True)
+            return iter(list(self._buffer))
+        self._spill()
+        return heapq.merge(*(self._read_run(run_file) for run_file in self._runs), key=_first, reverse=True)
+
+    @staticmethod
+    def _read_run(run_file):
+        with open(run_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def values(self):
+        """按键从大到小产出值"""
+        for _, value in self:
+            yield value
+
+    def close(self):
+        """删除临时文件"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._buffer = []
+        self._runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TopK:
+    """只保留键最大的 k 条记录（键不能重复）"""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+
+    def push(self, key, value):
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (key, value))
+        elif key > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (key, value))
+
+    def values(self):
+        """按键从大到小返回保留的值"""
+        return [value for _, value in sorted(self._heap, key=_first, reverse=True)]
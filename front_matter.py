@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markdown 文章的 YAML front matter 读取与解析
+扫描文章元数据时只读到 front matter 结束的 `---` 为止，需要时再读正文开头的一小段，
+读取量与文件大小无关；解析器支持文章中常见的 YAML 子集：
+`键: 值`、引号字符串、行内列表 `[a, "b, c"]`、多行列表（`- 项`）、缩进续行和 `|` / `>` 多行文本。
+"""
+
+import json
+
+DELIMITER = '---'
+
+# 块标量的标记（`|` 保留换行，`>` 折叠为空格；末尾换行统一去掉）
+_BLOCK_STYLES = ('|', '|-', '|+', '>', '>-', '>+')
+
+
+def read_front_matter(f):
+    """从已打开的文本文件开头读取 front matter
+
+    逐行读取，遇到结束的 `---` 即停止，文件的其余部分不会被读取。
+    返回 (front matter 字典, 结束行 `---` 之后的剩余文本)；没有 front matter 时返回 (None, '')。
+    调用方可以接着用 f.read(n) 读取正文开头。
+    """
+    first_line = f.readline()
+    if first_line.rstrip() != DELIMITER:
+        return None, ''
+
+    lines = []
+    for line in f:
+        if line.rstrip() == DELIMITER:
+            return parse_front_matter_lines(lines), line[len(DELIMITER):]
+        lines.append(line)
+    return None, ''
+
+
+def parse_front_matter(content):
+    """解析文本开头的 YAML front matter，没有时返回 None"""
+    lines = content.splitlines(keepends=True)
+    if not lines or lines[0].rstrip() != DELIMITER:
+        return None
+    for end, line in enumerate(lines[1:], 1):
+        if line.rstrip() == DELIMITER:
+            return parse_front_matter_lines(lines[1:end])
+    return None
+
+
+def parse_front_matter_lines(lines):
+    """解析 front matter 的各行（不含首尾的 `---`），返回字典"""
+    front_matter = {}
+    key = None          # 最近一个顶层键
+    scalar = None       # 该键的值还可能有缩进续行时，已收集的各行
+    block = None        # 块标量 (样式, 已收集的各行)
+
+    def finish():
+        nonlocal scalar, block
+        if block is not None:
+            front_matter[key] = _join_block(*block)
+        elif scalar is not None:
+            front_matter[key] = parse_scalar(' '.join(scalar))
+        scalar = block = None
+
+    for raw_line in lines:
+        line = raw_line.rstrip('\r\n')
+        stripped = line.strip()
+        indented = line[:1] in (' ', '\t')
+
+        if block is not None and (indented or not stripped):
+            block[1].append(line)
+            continue
+        if not stripped or stripped.startswith('#'):
+            continue
+
+        if stripped == '-' or stripped.startswith('- '):
+            # 多行列表的一项（`键:` 后面的值为空时才开始列表）
+            if key is not None and scalar is None and block is None:
+                if not isinstance(front_matter[key], list):
+                    front_matter[key] = []
+                front_matter[key].append(parse_scalar(stripped[1:].strip()))
+            continue
+
+        if indented and scalar is not None:
+            # 上一个值的缩进续行，按 YAML 规则以空格连接
+            scalar.append(stripped)
+            continue
+
+        if ':' not in stripped:
+            continue
+        finish()
+        key, value = stripped.split(':', 1)
+        key = key.strip()
+        value = value.strip()
+
+        if value in _BLOCK_STYLES:
+            block = (value[0], [])
+        elif value.startswith('[') and value.endswith(']'):
+            front_matter[key] = parse_inline_list(value[1:-1])
+        elif value:
+            scalar = [value]
+        else:
+            front_matter[key] = ''
+    finish()
+    return front_matter
+
+
+def parse_scalar(value):
+    """解析单个值：去掉引号并处理转义"""
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value[1:-1]
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    return value
+
+
+def parse_inline_list(text):
+    """解析行内列表 `[...]` 的内容，引号中的逗号不作为分隔符"""
+    items = []
+    current = []
+    quote = None
+    for char in text:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char == ',':
+            items.append(''.join(current))
+            current = []
+            continue
+        current.append(char)
+    items.append(''.join(current))
+    return [parse_scalar(item.strip()) for item in items if item.strip()]
+
+
+def _join_block(style, lines):
+    """拼接块标量的各行（去掉公共缩进）"""
+    indent = min((len(line) - len(line.lstrip()) for line in lines if line.strip()), default=0)
+    lines = [line[indent:] for line in lines]
+    if style == '|':
+        return '\n'.join(lines).strip('\n')
+    # 折叠：相邻的非空行以空格连接，空行变为换行
+    paragraphs = '\n'.join(lines).strip('\n').split('\n\n')
+    return '\n'.join(' '.join(line.strip() for line in paragraph.split('\n')) for paragraph in paragraphs)
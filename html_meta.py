@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+旧版 HTML 文章的元数据提取
+一遍向前读取页面，取出标题（h2.post-title）、日期（div.post-date）、标签（span.tag）、
+摘要段落（div.post-abstract / div.post-content 之后的第一个 <p>）和 meta keywords：
+
+- 用字符串查找直接跳到这些元素的开始标签：查找 post-title、tag、keywords 等记号（不论引号写法），
+  只有记号完整、且位于开始标签之内时才解析这个标签（等待摘要段落时还查找 <p）；
+  导航栏、正文的其余段落、脚本等都不解析
+- 找到的开始标签交给 html.parser 解析，属性的顺序和引号写法不限，class 按空白分成多个类名分别判断
+  （如 class='post-title big'）；元素的内容取到它的结束标签为止，保留原始 HTML 文本（实体不解码），
+  与原先的正则提取结果一致
+- 边读边查找，标签容器（div.tag-container，在文章末尾）结束后立即停止读取；
+  单篇页面最多读取 MAX_SCAN_CHARS 个字符，开销与读取的字符数成正比，不会因为标签不闭合而变慢
+"""
+
+import io
+import re
+import html.parser
+
+# 每次读取的字符数
+CHUNK_SIZE = 16 * 1024
+
+# 单篇页面最多读取的字符数
+MAX_SCAN_CHARS = 16 * 1024 * 1024
+
+# 一个开始或结束标签最多的字符数（超过时视为页面不完整，停止读取）
+MAX_TAG_CHARS = 64 * 1024
+
+# 查找的标记；post-、tag 开头的标记只有是 TOKENS 中的完整记号时才解析所在的开始标签
+MARKERS = ('post-', 'tag', 'keywords')
+TOKENS = frozenset({'post-title', 'post-date', 'post-abstract', 'post-content', 'tag-container', 'tag', 'keywords'})
+
+# 标签容器中的标记：嵌套的 div（判断容器在哪里结束）和标签
+CONTAINER_MARKERS = ('<div', '</div', 'tag')
+
+# 记号前后可以出现的字符（属性值的引号、类名之间的空白、属性名后的 =）
+_TOKEN_RE = re.compile(r'[\w-]+(?=["\'\s>/]|$)')
+_TOKEN_BEFORE = frozenset('"\'= \t\n\r\f')
+
+# 查找时保留在内存中的已查找文本的字符数（标记所在的开始标签可能从这里开始）
+_OVERLAP = 256
+
+
+class PostMetaParser(html.parser.HTMLParser):
+    """解析 read_post_meta 找到的开始标签，记录文章元数据；done 为 True 时不需要再输入"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.title = None
+        self.date = None
+        self.tags = []
+        self.abstract_paragraph = None  # div.post-abstract 之后的第一段
+        self.content_paragraph = None   # div.post-content 之后的第一段
+        self.keywords = None
+        self.done = False
+        # 刚开始、需要取出内容的元素：(字段列表, 结束标签)
+        self.capture = None
+        # 标签容器中打开的 div 数（不在标签容器中时为 0）
+        self.tag_container_depth = 0
+        self._after_abstract = False
+        self._after_content = False
+
+    def wants_paragraph(self):
+        """摘要还没有确定，接下来的 <p> 是摘要段落"""
+        if self.content_paragraph is not None or self._has_abstract():
+            return False
+        return ((self._after_abstract and self.abstract_paragraph is None)
+                or (self._after_content and self.content_paragraph is None))
+
+    def finish_capture(self, text):
+        """记录 capture 元素的内容（开始标签与结束标签之间的原始 HTML 文本）"""
+        fields, _ = self.capture
+        self.capture = None
+        for field in fields:
+            if field == 'tags':
+                self.tags.append(text.strip())
+            else:
+                setattr(self, field, text)
+
+    def close_div(self):
+        """标签容器中的一个 div 结束"""
+        self.tag_container_depth -= 1
+        if not self.tag_container_depth:
+            # 标签在文章末尾，标签容器结束时其余内容都已找到（或页面中没有）
+            self.done = True
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'div':
+            if self.tag_container_depth:
+                self.tag_container_depth += 1
+            elif 'tag-container' in classes:
+                self.tag_container_depth = 1
+            elif 'post-abstract' in classes:
+                self._after_abstract = True
+            elif 'post-content' in classes:
+                self._after_content = True
+            elif 'post-date' in classes and self.date is None:
+                self.capture = (['date'], 'div')
+        elif tag == 'p':
+            fields = []
+            if self._after_abstract and self.abstract_paragraph is None:
+                fields.append('abstract_paragraph')
+            if self._after_content and self.content_paragraph is None:
+                fields.append('content_paragraph')
+            if fields:
+                self.capture = (fields, 'p')
+        elif tag == 'h2' and 'post-title' in classes and self.title is None:
+            self.capture = (['title'], 'h2')
+        elif tag == 'span' and 'tag' in classes:
+            self.capture = (['tags'], 'span')
+        elif tag == 'meta' and attrs.get('name') == 'keywords' and self.keywords is None:
+            self.keywords = attrs.get('content')
+
+    def handle_startendtag(self, tag, attrs):
+        # <div/> 没有内容，也不需要结束标签；其余按开始标签处理（如 <meta ... />）
+        if tag != 'div':
+            self.handle_starttag(tag, attrs)
+
+    def _has_abstract(self):
+        abstract = self.abstract_paragraph
+        return abstract is not None and abstract.strip() not in ('', "暂无摘要")
+
+
+class _Stream:
+    """分块读取的文本，只能向前查找；处理过的部分随时丢弃，内存中只保留未处理的一段
+
+    位置都相对于 text 的开头；base 为 text[0] 在整个页面中的位置
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.text = ''
+        self.base = 0
+        self.scanned = 0
+        self.eof = False
+        # 各标记下一次出现的位置、确定没有出现的范围（页面中的位置），避免重复查找
+        self._next = {}
+        self._clear = {}
+
+    def find(self, sub, start=0, limit=MAX_TAG_CHARS):
+        """在 text[start:start + limit] 中查找 sub，不够时继续读取；找不到时返回 -1"""
+        while True:
+            index = self.text.find(sub, start, start + limit)
+            if index >= 0:
+                return index
+            # 每次多读与已有内容一样多的字符，很长的元素总的查找开销也与它的长度成正比
+            if len(self.text) - start >= limit or not self.read_more(len(self.text)):
+                return -1
+
+    def find_any(self, subs):
+        """查找 subs 中最先出现的一个，返回位置（找不到时为 -1）；已经查找过的范围不再重复查找"""
+        while True:
+            best = -1
+            for sub in subs:
+                index = self._next.get(sub, -1)
+                if index < self.base:
+                    start = max(self._clear.get(sub, self.base), self.base)
+                    found = self.text.find(sub, start - self.base)
+                    if found < 0:
+                        self._clear[sub] = self.base + max(start - self.base, len(self.text) - len(sub) + 1)
+                        continue
+                    index = self._next[sub] = self.base + found
+                if best < 0 or index < best:
+                    best = index
+            if best >= 0:
+                return best - self.base
+            if len(self.text) > _OVERLAP:
+                # 没有找到任何标记的部分不再需要
+                self.consume(len(self.text) - _OVERLAP)
+            if not self.read_more():
+                return -1
+
+    def is_token(self, position):
+        """text[position:] 开头是 TOKENS 中的一个完整记号（前后是引号、空白、= 等）"""
+        if position == 0 or self.text[position - 1] not in _TOKEN_BEFORE:
+            return False
+        if len(self.text) - position < _OVERLAP:
+            # 记号可能被分在两块中
+            self.read_more()
+        match = _TOKEN_RE.match(self.text, position)
+        return match is not None and match.group() in TOKENS
+
+    def consume(self, end):
+        """取出 text[:end]，剩余部分成为新的 text"""
+        taken = self.text[:end]
+        self.text = self.text[end:]
+        self.base += end
+        return taken
+
+    def read_more(self, size=CHUNK_SIZE):
+        """再读入 size 个字符（至少 CHUNK_SIZE），已经读完或读满 MAX_SCAN_CHARS 时返回 False"""
+        if self.eof or self.scanned >= MAX_SCAN_CHARS:
+            return False
+        chunk = self.f.read(min(max(size, CHUNK_SIZE), MAX_SCAN_CHARS - self.scanned))
+        if not chunk:
+            self.eof = True
+            return False
+        self.scanned += len(chunk)
+        self.text += chunk
+        return True
+
+
+def read_post_meta(f):
+    """从已打开的文本文件中向前读取页面，返回收集了元数据的 PostMetaParser
+
+    标签容器结束或读满 MAX_SCAN_CHARS 个字符后停止读取，文件的其余部分不会被读取
+    """
+    parser = PostMetaParser()
+    stream = _Stream(f)
+    while not parser.done:
+        if parser.capture is not None:
+            # 元素的内容取到它的结束标签为止
+            end = stream.find(f"</{parser.capture[1]}", limit=MAX_SCAN_CHARS)
+            if end < 0:
+                break
+            parser.finish_capture(stream.consume(end))
+            continue
+        if parser.tag_container_depth:
+            position = stream.find_any(CONTAINER_MARKERS)
+            if position >= 0 and stream.text.startswith('</div', position):
+                close = stream.find('>', position)
+                if close < 0:
+                    break
+                stream.consume(close + 1)
+                parser.close_div()
+                continue
+        else:
+            # 等待摘要段落时还要找 <p>
+            position = stream.find_any(MARKERS + ('<p',) if parser.wants_paragraph() else MARKERS)
+        if position < 0:
+            break
+        # 从标记所在的开始标签开始解析，之前的内容跳过；不是完整记号、不在开始标签之内（如正文中的文字）时跳过
+        start = stream.text.rfind('<', 0, position + 1)
+        if (start < 0 or stream.text.find('>', start, position) >= 0
+                or (start < position and not stream.is_token(position))):
+            stream.consume(position + 1)
+            continue
+        stream.consume(start)
+        close = stream.find('>')
+        if close < 0:
+            break
+        parser.reset()
+        parser.feed(stream.consume(close + 1))
+    return parser
+
+
+def parse_post_meta(content):
+    """解析已经读入内存的页面内容，返回 PostMetaParser（同样在标签容器结束后停止）"""
+    return read_post_meta(io.StringIO(content))
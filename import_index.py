@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导入的笔记索引
+在文章元数据库的 imported_notes 表中记录每篇导入过的笔记：大小、修改时间、内容哈希、生成的文章目录 post/<slug>/，
+以及内容完全相同时指向的另一篇笔记。再次导入同一批笔记时：
+
+- 大小和修改时间都没变的笔记直接跳过，不读取文件；只是修改时间变了、内容哈希没变的笔记也不重新生成
+- 与另一篇笔记内容完全相同的笔记不再生成一份页面，而是指向那篇笔记的文章
+- 标题转换出的 slug 相同时，按笔记路径的顺序依次使用 slug、slug-2、slug-3……；已经分配的 slug 之后保持不变
+- 标题变了（换了 slug）或变成内容重复的笔记时，删除原来生成的文章页面
+
+每批笔记导入完成后提交一次，导入中断后再次导入会从中断的地方继续。
+"""
+
+from pathlib import Path
+
+POST_DIR = Path("post")
+
+
+def post_page(slug):
+    return POST_DIR / slug / "index.html"
+
+
+class ImportIndex:
+    """导入过的笔记（常驻内存）和本次导入中分配的 slug"""
+
+    def __init__(self, store):
+        self.store = store
+        # 笔记路径 → (大小, 修改时间, 内容哈希, slug, 内容相同的笔记)
+        self.notes = store.imported_notes()
+        # slug → 使用它的笔记；内容哈希 → 生成了页面的笔记（内容相同的笔记指向它）
+        self.owners = {}
+        self.originals = {}
+        for source, (_, _, digest, slug, duplicate_of) in sorted(self.notes.items()):
+            if duplicate_of is None:
+                self.owners.setdefault(slug, source)
+                self.originals.setdefault(digest, source)
+        # 本次导入中分配了 slug 的笔记
+        self.slugs = {}
+        self._pending = []
+
+    def is_unchanged(self, source, size, mtime_ns):
+        """笔记的大小和修改时间与上次导入时相同，且生成的文章还在"""
+        note = self.notes.get(source)
+        return note is not None and note[:2] == (size, mtime_ns) and self._is_current(source)
+
+    def same_content(self, source, digest):
+        """笔记的内容哈希与上次导入时相同，且生成的文章还在（只是修改时间变了）"""
+        note = self.notes.get(source)
+        return note is not None and note[2] == digest and self._is_current(source)
+
+    def _is_current(self, source):
+        _, _, digest, slug, duplicate_of = self.notes[source]
+        if duplicate_of is not None:
+            original = self.notes.get(duplicate_of)
+            if original is None or original[2] != digest:
+                return False
+        return post_page(slug).exists()
+
+    def find_original(self, source, digest):
+        """内容完全相同、已经（或本次）生成了文章的另一篇笔记，返回 (笔记路径, slug) 或 None"""
+        original = self.originals.get(digest)
+        if original is None or original == source:
+            return None
+        if original in self.notes and not self._is_current(original):
+            return None
+        return original, self._slug_of(original)
+
+    def assign_slug(self, source, base):
+        """为笔记分配文章 slug：沿用上次分配的（标题没变时），否则按 base、base-2、base-3…… 取第一个没被占用的"""
+        note = self.notes.get(source)
+        if note is not None and note[4] is None:
+            slug = note[3]
+            if slug == base or (slug.startswith(f"{base}-") and slug[len(base) + 1:].isdigit()):
+                if not self._taken(slug, source):
+                    return self._claim(slug, source)
+        number = 1
+        slug = base
+        while self._taken(slug, source):
+            number += 1
+            slug = f"{base}-{number}"
+        return self._claim(slug, source)
+
+    def claim_content(self, source, digest):
+        """记下本次将为这份内容生成文章的笔记，之后内容相同的笔记指向它"""
+        old = self.notes.get(source)
+        if old is not None and old[2] != digest and self.originals.get(old[2]) == source:
+            # 内容变了，旧内容不再由这篇笔记提供
+            del self.originals[old[2]]
+        self.originals.setdefault(digest, source)
+
+    def _slug_of(self, source):
+        return self.slugs.get(source) or self.notes[source][3]
+
+    def _claim(self, slug, source):
+        self.owners[slug] = source
+        self.slugs[source] = slug
+        return slug
+
+    def _taken(self, slug, source):
+        owner = self.owners.get(slug)
+        if owner is not None:
+            return owner != source
+        # 被 post 目录中的 Markdown 文章等其他源文件使用的路径（同一路径下的旧页面可以覆盖）
+        existing = self.store.find_by_path(f"./post/{slug}/")
+        return existing is not None and existing[0] != str(post_page(slug))
+
+    def record(self, source, size, mtime_ns, digest, slug, duplicate_of=None):
+        """记录一篇导入完成的笔记（flush 时写入数据库）
+
+        笔记原来生成的文章换了 slug（标题变了）或不再需要（变成了内容重复的笔记）时，
+        删除原来的文章页面并释放原来的 slug，返回被删除的 slug（没有时为 None）
+        """
+        removed = None
+        old = self.notes.get(source)
+        if old is not None and old[4] is None and (old[3] != slug or duplicate_of is not None):
+            removed = self._release(old[3], source)
+        note = (size, mtime_ns, digest, slug, duplicate_of)
+        self.notes[source] = note
+        if duplicate_of is None:
+            self.owners[slug] = source
+            self.originals.setdefault(digest, source)
+        self._pending.append((source,) + note)
+        return removed
+
+    def _release(self, slug, source):
+        """笔记不再使用原来的 slug：slug 仍归它所有时删除对应的文章页面（和空目录），返回 slug"""
+        if self.owners.get(slug) != source:
+            # 已经分配给了别的笔记，页面由那篇笔记重新生成
+            return None
+        del self.owners[slug]
+        page = post_page(slug)
+        page.unlink(missing_ok=True)
+        try:
+            page.parent.rmdir()
+        except OSError:
+            pass
+        return slug
+
+    def flush(self):
+        """把记录写入数据库并提交"""
+        if self._pending:
+            self.store.record_imported_notes(self._pending)
+            self._pending = []
+        self.store.commit()
@@ -0,0 +1,693 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markdown 渲染器
+按行切分块级结构（标题、代码块、列表、引用、表格、段落），
+块内再用一次从左到右的扫描处理行内语法，整个文档只遍历一遍。
+代码块和行内代码中的内容只做 HTML 转义，不会再应用任何行内规则。
+"""
+
+import re
+import html
+import unicodedata
+
+# 渲染规则有变化时修改此版本号（渲染缓存会据此失效）
+RENDERER_VERSION = "3"
+
+# 块级语法
+_FENCE_RE = re.compile(r'^( {0,3})(`{3,}|~{3,})[ \t]*([^`\s]*)[^`]*$')
+_QUOTE_RE = re.compile(r'^ {0,3}> ?(.*)$')
+_TABLE_DELIM_RE = re.compile(r'^ {0,3}\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$')
+
+# 一次匹配判断一行可能开始的块类型，普通文字开头的行会立即匹配失败；
+# 列表项同时取出标记和标记后的空白，列表项的内容从匹配结束处开始
+_BLOCK_START_RE = re.compile(
+    r' {0,3}(?:'
+    r'(?P<fence>`{3}|~{3})'
+    r'|(?P<heading>#{1,6})(?:[ \t]|$)'
+    r'|(?P<hr>(?:\*[ \t]*){3,}$|(?:-[ \t]*){3,}$|(?:_[ \t]*){3,}$)'
+    r'|(?P<quote>>)'
+    r'|(?P<list>(?P<marker>[-*+]|(?P<number>\d{1,9})[.)])(?P<spacing>[ \t]+(?=\S)|[ \t]*$))'
+    r'|(?P<html><(?:[A-Za-z]|/[A-Za-z]|!--))'
+    r')'
+)
+# 可能开始一个块的行的第一个字符（空格开头的行由正则判断缩进后的字符）
+_BLOCK_START_CHARS = frozenset(' `~#*-_>+<0123456789')
+
+# 行内语法
+# 每次查找跳到下一个特殊字符；不含嵌套语法的常见片段（粗体、斜体、行内代码、链接）
+# 在同一次匹配中完整识别。片段内容排除了所有特殊字符，匹配失败时最多扫描到下一个
+# 特殊字符，因此整体仍是线性的。其余情况由逐字符的处理逻辑负责。
+# 粗体、斜体只匹配与分隔符栈规则结果相同的写法：开始标记前是开头、空白或常见标点
+# （不能同时作为结束标记），内容首尾是字母、数字或汉字
+_PUNCTUATION_CLASS = r'!-/:-@\[-`{-~，。、；：？！“”‘’（）【】《》'
+_INLINE_RE = re.compile(
+    r'[\\`*_!\[<>&\n](?:'
+    r'(?<=\*)(?<![^\s' + _PUNCTUATION_CLASS + r']\*)\*(?P<strong>[^\W_](?:[^\n\\`*_\[<>&]*?[^\W_])?)\*\*(?!\*)'
+    r'|(?<=\*)(?<![^\s' + _PUNCTUATION_CLASS + r']\*)(?P<em>[^\W_](?:[^\n\\`*_\[<>&]*?[^\W_])?)\*(?!\*)'
+    r'|(?<=`)(?P<code>[^`\n]+)`(?!`)'
+    r'|(?<=\[)(?P<link_text>[^\n\\`*_!\[\]<>&]+)\]\((?P<link_url>[^\s()<>"\'\\]+)\)'
+    r')?'
+)
+_ESCAPABLE_CHARS = frozenset('\\`*_{}[]()#+-.!|<>"\'~')
+_ENTITY_RE = re.compile(r'&(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[A-Za-z][A-Za-z0-9]{1,31});')
+_AUTOLINK_RE = re.compile(r'<((?:https?|ftp)://[^\s<>]+)>')
+_INLINE_TAG_RE = re.compile(r'</?[A-Za-z][A-Za-z0-9-]*(?:\s[^<>]*)?/?>')
+_LINK_DEST_RE = re.compile(r'^<?([^\s<>]*)>?(?:\s+(?:"([^"]*)"|\'([^\']*)\'))?$')
+
+
+def render_markdown(markdown_content, hard_breaks=True):
+    """将 Markdown 文本渲染为 HTML
+
+    hard_breaks 为 True 时段落内的换行渲染为 <br>（与站点 marked 的 breaks 配置一致）
+    """
+    if '\r' in markdown_content:
+        markdown_content = markdown_content.replace('\r\n', '\n').replace('\r', '\n')
+    lines = markdown_content.split('\n')
+    return '\n'.join(_render_blocks(lines, hard_breaks=hard_breaks))
+
+
+def _escape(text):
+    return html.escape(text, quote=False)
+
+
+def _escape_attr(text):
+    return html.escape(text, quote=True)
+
+
+def _indent_width(line):
+    return len(line) - len(line.lstrip(' '))
+
+
+def _is_table_start(line, next_line):
+    return '|' in line and '-' in next_line and _TABLE_DELIM_RE.match(next_line) is not None
+
+
+def _match_block_start(line):
+    """匹配一行可能开始的块类型；第一个字符不可能开始块时不执行正则"""
+    if line[:1] in _BLOCK_START_CHARS:
+        return _BLOCK_START_RE.match(line)
+    return None
+
+
+def _starts_block(line, next_line=None):
+    """判断一行是否会打断当前段落"""
+    if next_line is not None and '|' in line and _is_table_start(line, next_line):
+        return True
+    match = _match_block_start(line)
+    if match is None:
+        return False
+    if match.lastgroup != 'list':
+        return match.lastgroup != 'fence' or _FENCE_RE.match(line) is not None
+    # 空列表项不能打断段落，有序列表只有从 1 开始时才能打断段落
+    number = match.group('number')
+    return bool(line.strip()[len(number or '') + 1:].strip()) and number in (None, '1')
+
+
+def _render_blocks(lines, tight=False, hard_breaks=True):
+    """渲染块级结构，tight 为 True 时段落不包裹 <p>（紧凑列表项）"""
+    out = []
+    i = 0
+    n = len(lines)
+    while i < n:
+        line = lines[i]
+        if not line or line.isspace():
+            i += 1
+            continue
+
+        block = _BLOCK_START_RE.match(line) if line[0] in _BLOCK_START_CHARS else None
+        if block is not None:
+            kind = block.lastgroup
+
+            if kind == 'heading':
+                # 标题
+                level = block.end('heading') - block.start('heading')
+                text = line[block.end('heading'):].strip(' \t')
+                if text.endswith('#'):
+                    text = _strip_closing_hashes(text)
+                out.append(f'<h{level}>{render_inline(text)}</h{level}>')
+                i += 1
+                continue
+
+            elif kind == 'list':
+                # 列表
+                i = _render_list(lines, i, block, out, hard_breaks)
+                continue
+
+            elif kind == 'fence':
+                # 代码块
+                match = _FENCE_RE.match(line)
+                if match:
+                    i = _render_fence(lines, i, match, out)
+                    continue
+
+            elif kind == 'quote':
+                # 引用
+                i = _render_blockquote(lines, i, out, hard_breaks)
+                continue
+
+            elif kind == 'hr':
+                # 分隔线
+                out.append('<hr>')
+                i += 1
+                continue
+
+            else:
+                # HTML 块原样输出
+                start = i
+                while i < n and lines[i].strip():
+                    i += 1
+                out.append('\n'.join(lines[start:i]))
+                continue
+
+        # 表格
+        if i + 1 < n and '|' in line and _is_table_start(line, lines[i + 1]):
+            i = _render_table(lines, i, out)
+            continue
+
+        # 段落（多数段落只有一行，下一行就是空行）
+        start = i
+        i += 1
+        if i < n and not lines[i]:
+            text = line.strip()
+            i += 1
+        else:
+            while i < n:
+                line = lines[i]
+                if not line or line.isspace() or _starts_block(line, lines[i + 1] if i + 1 < n else None):
+                    break
+                i += 1
+            text = '\n'.join([l.strip() for l in lines[start:i]])
+        if tight:
+            out.append(render_inline(text, hard_breaks))
+        else:
+            out.append(f'<p>{render_inline(text, hard_breaks)}</p>')
+    return out
+
+
+def _strip_closing_hashes(text):
+    """去掉标题内容结尾前有空白的 # 序列（只用字符串方法，不用正则回溯查找）"""
+    body = text.rstrip('#')
+    if body.endswith((' ', '\t')):
+        return body.rstrip(' \t')
+    return text
+
+
+def _render_fence(lines, i, match, out):
+    """渲染围栏代码块，返回下一行的位置"""
+    indent = len(match.group(1))
+    fence = match.group(2)
+    lang = match.group(3)
+    fence_char = fence[0]
+    n = len(lines)
+    start = i + 1
+    # 结束围栏最多缩进 3 个空格，前 4 个字符中没有围栏字符的行可以直接跳过
+    for end in range(start, n):
+        line = lines[end]
+        if fence_char in line[:4]:
+            stripped = line.strip()
+            if len(stripped) >= len(fence) and not stripped.strip(fence_char) and _indent_width(line) <= 3:
+                break
+    else:
+        end = n
+
+    code_lines = lines[start:end]
+    if indent:
+        code_lines = [line[min(indent, _indent_width(line)):] for line in code_lines]
+    code = _escape('\n'.join(code_lines))
+    if code_lines:
+        code += '\n'
+    if lang:
+        out.append(f'<pre><code class="language-{_escape_attr(lang)}">{code}</code></pre>')
+    else:
+        out.append(f'<pre><code>{code}</code></pre>')
+    return end + 1
+
+
+def _render_blockquote(lines, i, out, hard_breaks=True):
+    """渲染引用块（支持懒惰续行），返回下一行的位置"""
+    n = len(lines)
+    inner = []
+    while i < n:
+        line = lines[i]
+        match = _QUOTE_RE.match(line)
+        if match:
+            inner.append(match.group(1))
+        elif line.strip() and inner and inner[-1].strip() and not _starts_block(line):
+            inner.append(line)
+        else:
+            break
+        i += 1
+    out.append('<blockquote>\n' + '\n'.join(_render_blocks(inner, hard_breaks=hard_breaks)) + '\n</blockquote>')
+    return i
+
+
+def _render_simple_list(lines, i, match, out, hard_breaks=True):
+    """渲染最常见的无序列表：紧凑、每项一行、各项的标记和之后的空白完全相同（如 "- "）
+
+    逐行只用字符串比较判断是否是下一项，不匹配正则；返回下一行的位置，
+    不是这种列表时返回 None（不输出任何内容），由 _render_list 按一般规则处理
+    """
+    marker_end = match.end('marker')
+    end = match.end()
+    if not 0 < end - marker_end <= 4:
+        return None
+    n = len(lines)
+    prefix = lines[i][:end]
+    bullet = prefix[marker_end - 1]
+    k = i
+    while k < n:
+        line = lines[k]
+        # 标记后没有内容、分隔线都不是这种列表项
+        if not line.startswith(prefix) or line[end:end + 1] in ' \t' or not line.strip(bullet + ' \t'):
+            break
+        # 内容本身是块（如嵌套的列表、标题）时按一般规则处理
+        if line[end] in _BLOCK_START_CHARS and _BLOCK_START_RE.match(line, end) is not None:
+            return None
+        k += 1
+    if k < n and lines[k] and not lines[k].isspace():
+        # 续行、懒惰续行或紧接的其他块
+        return None
+    j = k
+    while j < n and (not lines[j] or lines[j].isspace()):
+        j += 1
+    if j < n:
+        # 空行后缩进的行属于最后一项，同类标记的行是下一项（松散列表）
+        if lines[j].startswith(' ' * end):
+            return None
+        block = _match_block_start(lines[j])
+        if block is not None and block.lastgroup == 'list' and block.group('marker')[-1] == bullet:
+            return None
+    items = [render_inline(line[end:].strip(), hard_breaks) for line in lines[i:k]]
+    out.append('<ul>\n<li>' + '</li>\n<li>'.join(items) + '</li>\n</ul>')
+    return k
+
+
+def _render_list(lines, i, match, out, hard_breaks=True):
+    """渲染有序/无序列表，match 为第一个列表项的块匹配结果，返回下一行的位置"""
+    number = match.group('number')
+    ordered = number is not None
+    if not ordered:
+        end = _render_simple_list(lines, i, match, out, hard_breaks)
+        if end is not None:
+            return end
+    n = len(lines)
+    bullet = match.group('marker')[-1]
+    start_number = int(number) if ordered else 1
+    items = []
+    loose = False
+
+    while True:
+        # 标记后的空白超过 4 个（或没有内容）时，内容缩进按标记后一个空格计算
+        marker_end = match.end('marker')
+        end = match.end()
+        content_indent = marker_end + (end - marker_end if 0 < end - marker_end <= 4 else 1)
+        padding = ' ' * content_indent
+        item_lines = [lines[i][end:]]
+        i += 1
+        block = None
+        while i < n:
+            line = lines[i]
+            if not line or line.isspace():
+                # 空行后下一个非空行仍然缩进时属于当前列表项
+                j = i + 1
+                while j < n and (not lines[j] or lines[j].isspace()):
+                    j += 1
+                if j < n and lines[j].startswith(padding):
+                    item_lines.extend([''] * (j - i))
+                    loose = True
+                    i = j
+                    continue
+                break
+            if line.startswith(padding):
+                item_lines.append(line[content_indent:])
+            else:
+                block = _match_block_start(line)
+                if block is not None or not item_lines[-1].strip():
+                    break
+                # 懒惰续行
+                item_lines.append(line.strip())
+            i += 1
+        items.append(item_lines)
+
+        # 同类型的下一个列表项
+        j = i
+        if block is None:
+            while j < n and (not lines[j] or lines[j].isspace()):
+                j += 1
+            if j >= n:
+                break
+            block = _match_block_start(lines[j])
+        # 有序列表与无序列表的标记结尾字符不同，比较结尾字符即可
+        if block is None or block.lastgroup != 'list' or block.group('marker')[-1] != bullet:
+            break
+        match = block
+        if j > i:
+            loose = True
+        i = j
+
+    rendered = []
+    for item_lines in items:
+        if not loose and len(item_lines) == 1 and _match_block_start(item_lines[0]) is None:
+            # 单行的紧凑列表项直接渲染行内内容
+            rendered.append('<li>' + render_inline(item_lines[0].strip(), hard_breaks) + '</li>')
+            continue
+        blocks = _render_blocks(item_lines, tight=not loose, hard_breaks=hard_breaks)
+        rendered.append('<li>' + '\n'.join(blocks) + '</li>')
+
+    if ordered:
+        start_attr = f' start="{start_number}"' if start_number != 1 else ''
+        out.append(f'<ol{start_attr}>\n' + '\n'.join(rendered) + '\n</ol>')
+    else:
+        out.append('<ul>\n' + '\n'.join(rendered) + '\n</ul>')
+    return i
+
+
+def _split_table_row(line):
+    """按未转义的 | 切分表格行"""
+    line = line.strip()
+    if '\\' in line:
+        if line.startswith('|'):
+            line = line[1:]
+        if line.endswith('|') and not line.endswith('\\|'):
+            line = line[:-1]
+        return [cell.strip().replace('\\|', '|') for cell in re.split(r'(?<!\\)\|', line)]
+    cells = line.split('|')
+    # 去掉行首、行尾的 | 切出的空单元格
+    if line[0] == '|':
+        del cells[0]
+    if len(cells) > 1 and line[-1] == '|':
+        del cells[-1]
+    return [cell.strip() for cell in cells]
+
+
+def _render_table(lines, i, out):
+    """渲染 GFM 表格，返回下一行的位置"""
+    n = len(lines)
+    header_line = lines[i]
+    header = _split_table_row(header_line)
+    columns = len(header)
+    aligns = []
+    for cell in _split_table_row(lines[i + 1]):
+        if cell.startswith(':') and cell.endswith(':'):
+            aligns.append('center')
+        elif cell.endswith(':'):
+            aligns.append('right')
+        elif cell.startswith(':'):
+            aligns.append('left')
+        else:
+            aligns.append(None)
+    aligns = (aligns + [None] * columns)[:columns]
+
+    def render_row(line, cells, starts, end):
+        if len(cells) != columns:
+            cells = (cells + [''] * columns)[:columns]
+        if _INLINE_RE.search(line) is not None:
+            # 整行有行内语法的特殊字符时才逐个渲染单元格，否则原样输出
+            cells = map(render_inline, cells)
+        return '<tr>' + ''.join(map(str.__add__, starts, cells)) + end
+
+    def row_tags(cell):
+        """各单元格之前的标签（上一格的结束标签和本格的开始标签）和行尾的标签"""
+        opens = [f'<{cell} style="text-align: {align}">' if align else f'<{cell}>' for align in aligns]
+        return [opens[0]] + [f'</{cell}>{tag}' for tag in opens[1:]], f'</{cell}></tr>'
+
+    body = []
+    starts, end = row_tags('td')
+    i += 2
+    while i < n:
+        line = lines[i]
+        if '|' not in line or (line[0] in _BLOCK_START_CHARS and _starts_block(line)):
+            break
+        body.append(render_row(line, _split_table_row(line), starts, end))
+        i += 1
+
+    table = ['<table>', '<thead>', render_row(header_line, header, *row_tags('th')), '</thead>']
+    if body:
+        table.append('<tbody>')
+        table.extend(body)
+        table.append('</tbody>')
+    table.append('</table>')
+    out.append('\n'.join(table))
+    return i
+
+
+class _Finder:
+    """带缓存的子串查找，保证对同一段文本的重复查找总体是线性的"""
+
+    __slots__ = ('text', 'cache')
+
+    def __init__(self, text):
+        self.text = text
+        self.cache = {}
+
+    def find(self, needle, start):
+        cached = self.cache.get(needle)
+        if cached is not None:
+            searched_from, found = cached
+            if searched_from <= start and (found == -1 or found >= start):
+                return found
+        found = self.text.find(needle, start)
+        self.cache[needle] = (start, found)
+        return found
+
+
+def _parse_link(text, i, finder):
+    """解析 [文本](地址 "标题")，i 指向 [，失败时返回 None"""
+    close = finder.find(']', i + 1)
+    if close == -1 or close + 1 >= len(text) or text[close + 1] != '(':
+        return None
+    end = finder.find(')', close + 2)
+    if end == -1:
+        return None
+    match = _LINK_DEST_RE.match(text[close + 2:end].strip())
+    if not match:
+        return None
+    title = match.group(2) if match.group(2) is not None else match.group(3)
+    return text[i + 1:close], match.group(1), title, end + 1
+
+
+def render_inline(text, hard_breaks=True):
+    """渲染行内语法（代码、链接、图片、粗体、斜体、转义、行内 HTML）"""
+    # 多数文字没有任何特殊字符；逐个用 in 判断比正则查找字符集快得多
+    if not ('*' in text or '[' in text or '`' in text or '_' in text or '\n' in text or '&' in text
+            or '<' in text or '>' in text or '\\' in text or '!' in text):
+        return text
+    match = _INLINE_RE.search(text)
+
+    out = []
+    finder = None
+    delimiters = None
+    n = len(text)
+    i = 0
+    while match:
+        pos = match.start()
+        if pos > i:
+            out.append(text[i:pos])
+        i = pos
+        ch = text[i]
+        kind = match.lastgroup
+
+        if kind is not None:
+            # 正则已完整匹配的简单片段
+            if kind == 'strong':
+                out.append(f'<strong>{match.group("strong")}</strong>')
+            elif kind == 'em':
+                out.append(f'<em>{match.group("em")}</em>')
+            elif kind == 'code':
+                code = match.group('code')
+                if len(code) > 2 and code[0] == ' ' and code[-1] == ' ':
+                    code = code[1:-1]
+                out.append(f'<code>{_escape(code)}</code>')
+            else:
+                out.append(f'<a href="{_escape_attr(match.group("link_url"))}">{match.group("link_text")}</a>')
+            i = match.end()
+            match = _INLINE_RE.search(text, i)
+            continue
+
+        if finder is None:
+            finder = _Finder(text)
+
+        if ch == '\n':
+            out.append('<br>\n' if hard_breaks else '\n')
+            i += 1
+
+        elif ch == '\\':
+            if i + 1 < n and text[i + 1] in _ESCAPABLE_CHARS:
+                out.append(_escape(text[i + 1]))
+                i += 2
+            else:
+                out.append('\\')
+                i += 1
+
+        elif ch == '`':
+            run_end = i
+            while run_end < n and text[run_end] == '`':
+                run_end += 1
+            ticks = text[i:run_end]
+            close = finder.find(ticks, run_end)
+            if close == -1:
+                out.append(ticks)
+                i = run_end
+            else:
+                code = text[run_end:close]
+                if len(code) > 2 and code[0] == ' ' and code[-1] == ' ':
+                    code = code[1:-1]
+                out.append(f'<code>{_escape(code)}</code>')
+                i = close + len(ticks)
+
+        elif ch == '!' or ch == '[':
+            is_image = ch == '!'
+            link = None
+            if not is_image or (i + 1 < n and text[i + 1] == '['):
+                link = _parse_link(text, i + 1 if is_image else i, finder)
+            if link is None:
+                out.append(ch)
+                i += 1
+            else:
+                label, url, title, i = link
+                title_attr = f' title="{_escape_attr(title)}"' if title is not None else ''
+                if is_image:
+                    out.append(f'<img src="{_escape_attr(url)}" alt="{_escape_attr(label)}"{title_attr}>')
+                else:
+                    out.append(f'<a href="{_escape_attr(url)}"{title_attr}>{render_inline(label, hard_breaks)}</a>')
+
+        elif ch == '*' or ch == '_':
+            # 连续的同一标记是一个分隔符，能否开始、结束强调由前后的字符决定，配对在最后统一进行
+            run_end = i + 1
+            while run_end < n and text[run_end] == ch:
+                run_end += 1
+            can_open, can_close = _flanking(text, i, run_end)
+            if can_open or can_close:
+                if delimiters is None:
+                    delimiters = []
+                delimiters.append([len(out), ch, run_end - i, can_open, can_close])
+            out.append(text[i:run_end])
+            i = run_end
+
+        elif ch == '<':
+            autolink = _AUTOLINK_RE.match(text, i)
+            tag = None if autolink else _INLINE_TAG_RE.match(text, i)
+            if autolink:
+                url = autolink.group(1)
+                out.append(f'<a href="{_escape_attr(url)}">{_escape(url)}</a>')
+                i = autolink.end()
+            elif tag:
+                out.append(tag.group(0))
+                i = tag.end()
+            else:
+                out.append('&lt;')
+                i += 1
+
+        elif ch == '>':
+            out.append('&gt;')
+            i += 1
+
+        else:  # '&'
+            entity = _ENTITY_RE.match(text, i)
+            if entity:
+                out.append(entity.group(0))
+                i = entity.end()
+            else:
+                out.append('&amp;')
+                i += 1
+
+        match = _INLINE_RE.search(text, i)
+
+    if i < n:
+        out.append(text[i:])
+    if delimiters is not None:
+        _process_emphasis(out, delimiters)
+    return ''.join(out)
+
+
+def _is_punctuation(ch):
+    """Unicode 标点或符号（CommonMark 判断分隔符前后字符时的标点）"""
+    return unicodedata.category(ch)[0] in 'PS'
+
+
+def _flanking(text, start, end):
+    """判断 text[start:end] 处的一串 * 或 _ 能否开始、结束强调，返回 (can_open, can_close)
+
+    按 CommonMark 的左右侧规则：文字开头和结尾视为空白；
+    下划线在单词内部（两侧都是字母数字）时既不能开始也不能结束强调（如 snake_case）
+    """
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    before_space = before.isspace()
+    after_space = after.isspace()
+    before_punct = not before_space and _is_punctuation(before)
+    after_punct = not after_space and _is_punctuation(after)
+    left = not after_space and (not after_punct or before_space or before_punct)
+    right = not before_space and (not before_punct or after_space or after_punct)
+    if text[start] == '_':
+        return left and (not right or before_punct), right and (not left or after_punct)
+    return left, right
+
+
+def _process_emphasis(out, delimiters):
+    """按 CommonMark 的分隔符栈规则配对强调标记，把结果写回 out 中各分隔符所在的片段
+
+    delimiters 中每项为 [在 out 中的位置, 标记字符, 个数, 能否开始, 能否结束]，按出现顺序排列。
+    从左到右依次处理能结束强调的分隔符，向前找最近的可配对的开始分隔符：两边都至少
+    两个时配成粗体，否则配成斜体，夹在中间的分隔符不再参与配对。已经找不到开始分隔符的
+    情况记录在 openers_bottom 中，之后不再重复查找，整体是线性的
+    """
+    count = len(delimiters)
+    # 仍参与配对的分隔符组成双向链表
+    prev = list(range(-1, count - 1))
+    following = list(range(1, count + 1))
+    remaining = [delimiter[2] for delimiter in delimiters]
+    opening_tags = [''] * count
+    closing_tags = [''] * count
+    openers_bottom = {}
+
+    def unlink(k):
+        if prev[k] >= 0:
+            following[prev[k]] = following[k]
+        if following[k] < count:
+            prev[following[k]] = prev[k]
+
+    closer = 0
+    while closer < count:
+        _, ch, length, closer_can_open, closer_can_close = delimiters[closer]
+        if not closer_can_close:
+            closer = following[closer]
+            continue
+        key = (ch, closer_can_open, length % 3)
+        bottom = openers_bottom.get(key, -1)
+        opener = prev[closer]
+        while opener > bottom:
+            _, opener_ch, opener_length, opener_can_open, opener_can_close = delimiters[opener]
+            # 能同时开始和结束强调的分隔符，两串长度之和是 3 的倍数时不能配对（除非都是 3 的倍数）
+            if opener_ch == ch and opener_can_open and not (
+                    (opener_can_close or closer_can_open) and (opener_length + length) % 3 == 0
+                    and (opener_length % 3 or length % 3)):
+                break
+            opener = prev[opener]
+        if opener <= bottom:
+            openers_bottom[key] = prev[closer]
+            following_closer = following[closer]
+            if not closer_can_open:
+                unlink(closer)
+            closer = following_closer
+            continue
+
+        used = 2 if remaining[opener] >= 2 and remaining[closer] >= 2 else 1
+        tag = 'strong' if used == 2 else 'em'
+        remaining[opener] -= used
+        remaining[closer] -= used
+        # 开始标记从右侧消耗，后配对的标签在外层；结束标记从左侧消耗
+        opening_tags[opener] = f'<{tag}>' + opening_tags[opener]
+        closing_tags[closer] += f'</{tag}>'
+        following[opener] = closer
+        prev[closer] = opener
+        if not remaining[opener]:
+            unlink(opener)
+        if not remaining[closer]:
+            following_closer = following[closer]
+            unlink(closer)
+            closer = following_closer
+
+    for k, (index, ch, _, _, _) in enumerate(delimiters):
+        out[index] = closing_tags[k] + ch * remaining[k] + opening_tags[k]
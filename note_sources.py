@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导入的笔记来源
+笔记可以来自一个目录（递归查找 .md / .markdown 文件），也可以直接来自导出的压缩包
+（.zip、.tar、.tar.gz / .tgz、.tar.bz2、.tar.xz），压缩包中的笔记逐篇流式读出，不解压到磁盘：
+
+- zip 只读取末尾的中央目录，笔记按包内路径排序后逐篇读取
+- tar（包括压缩的 tar）按包内顺序单遍读取，不回退、只解压一遍，笔记数在读完之前未知
+
+每篇笔记读入内存的字节数不超过 MAX_NOTE_BYTES（超出时视为读取失败），整个压缩包不会读入内存。
+笔记在导入索引中的键：目录中的笔记为文件的绝对路径，压缩包中的笔记为 "压缩包绝对路径!包内路径"。
+"""
+
+import os
+import time
+import tarfile
+import zipfile
+
+from output_writer import record_read
+
+NOTE_SUFFIXES = ('.md', '.markdown')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+# 单篇笔记最多读入的字节数
+MAX_NOTE_BYTES = 16 * 1024 * 1024
+
+# 从压缩包中读取笔记时每次读取的字节数
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class Note:
+    """一篇待导入的笔记
+
+    name 用于输出和从文件名取标题，source 为导入索引中的键，size / mtime_ns 用于判断笔记是否变化；
+    read() 读取全文（失败时返回 None）。流式读取的压缩包中，read() 只能在取下一篇笔记之前调用
+    """
+
+    __slots__ = ('name', 'source', 'size', 'mtime_ns', '_read')
+
+    def __init__(self, name, source, size, mtime_ns, read):
+        self.name = name
+        self.source = source
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self._read = read
+
+    @property
+    def mtime(self):
+        """修改时间（秒）"""
+        return self.mtime_ns / 1e9
+
+    def read(self):
+        """读取并解码整篇笔记，超过 MAX_NOTE_BYTES、读取或解码失败时返回 None"""
+        if self.size > MAX_NOTE_BYTES:
+            return None
+        try:
+            data = self._read()
+        except (OSError, EOFError, tarfile.TarError, zipfile.BadZipFile):
+            return None
+        if data is None:
+            return None
+        record_read(len(data))
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+        # 与文本模式读取文件相同，统一换行符
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def is_note(name):
+    return name.endswith(NOTE_SUFFIXES)
+
+
+def is_archive(path):
+    """path 是否为支持的压缩包（按扩展名判断）"""
+    name = str(path).lower()
+    return name.endswith('.zip') or name.endswith(TAR_SUFFIXES)
+
+
+def open_notes(path):
+    """打开笔记来源，返回 (依次产出 Note 的迭代器, 笔记数)；流式读取的 tar 包笔记数为 None
+
+    目录中的笔记按路径排序；zip 包中的笔记按包内路径排序；tar 包中的笔记按包内顺序
+    """
+    if os.path.isdir(path):
+        paths = directory_notes(path)
+        return (file_note(path) for path in paths), len(paths)
+    if str(path).lower().endswith('.zip'):
+        archive = zipfile.ZipFile(path)
+        members = sorted((info for info in archive.infolist()
+                          if not info.is_dir() and is_note(info.filename)),
+                         key=lambda info: info.filename)
+        return zip_notes(archive, members), len(members)
+    return tar_notes(path, tarfile.open(path, mode='r|*')), None
+
+
+def directory_notes(directory):
+    """目录（递归）中所有笔记的路径，按路径排序"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if is_note(file):
+                paths.append(os.path.join(root, file))
+    paths.sort()
+    return paths
+
+
+def file_note(path):
+    stat = os.stat(path)
+    return Note(path, os.path.abspath(path), stat.st_size, stat.st_mtime_ns,
+                lambda: _read_file(path))
+
+
+def zip_notes(archive, members):
+    """依次产出 zip 包中的笔记，读取完毕后关闭压缩包"""
+    prefix = os.path.abspath(archive.filename)
+    with archive:
+        for info in members:
+            mtime_ns = int(time.mktime(info.date_time + (0, 0, -1))) * 1_000_000_000
+            yield Note(f"{archive.filename}!{info.filename}", f"{prefix}!{info.filename}",
+                       info.file_size, mtime_ns,
+                       lambda info=info: _read_stream(archive.open(info)))
+
+
+def tar_notes(path, archive):
+    """依次产出 tar 包（以流式模式打开）中的笔记，不回退；读取完毕后关闭压缩包"""
+    prefix = os.path.abspath(path)
+    with archive:
+        for member in archive:
+            if not member.isfile() or not is_note(member.name):
+                continue
+            yield Note(f"{path}!{member.name}", f"{prefix}!{member.name}",
+                       member.size, int(member.mtime) * 1_000_000_000,
+                       lambda member=member: _read_stream(archive.extractfile(member)))
+
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return _read_bounded(f)
+
+
+def _read_stream(stream):
+    with stream:
+        return _read_bounded(stream)
+
+
+def _read_bounded(stream):
+    """分块读取，超过 MAX_NOTE_BYTES 时停止读取并返回 None（成员头中的大小可能不可信）"""
+    chunks = []
+    total = 0
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return b''.join(chunks)
+        total += len(chunk)
+        if total > MAX_NOTE_BYTES:
+            return None
+        chunks.append(chunk)
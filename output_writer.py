@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成页面的输出层
+内容与现有文件完全相同时跳过写入（不改变修改时间，不产生 git 变更）；
+需要写入时先写临时文件再原子替换，中途崩溃不会留下写了一半的页面。
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+
+def _read_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# 导入时读取一次 umask（os.umask 的读取方式不是线程安全的）
+_UMASK = _read_umask()
+
+_lock = threading.Lock()
+_stats = {'written': 0, 'skipped': 0, 'bytes_written': 0, 'bytes_read': 0}
+
+
+def write_text(path, content, encoding='utf-8'):
+    """写入文本文件，内容未变化时跳过；返回是否实际写入"""
+    return write_bytes(path, content.encode(encoding))
+
+
+def write_bytes(path, data):
+    """写入二进制文件，内容未变化时跳过；返回是否实际写入"""
+    path = Path(path)
+    if _same_content(path, data):
+        with _lock:
+            _stats['skipped'] += 1
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        if path.exists():
+            # 保留原文件的权限
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        else:
+            os.chmod(tmp_name, 0o666 & ~_UMASK)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    with _lock:
+        _stats['written'] += 1
+        _stats['bytes_written'] += len(data)
+    return True
+
+
+def write_chunks(path, chunks, encoding='utf-8'):
+    """分段写入文本文件（整个页面不必同时在内存中），内容未变化时跳过；返回是否实际写入
+
+    边写临时文件边与现有文件逐段比较，完全相同时丢弃临时文件
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        existing = open(path, 'rb')
+    except OSError:
+        existing = None
+    same = existing is not None
+    size = compared = 0
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in chunks:
+                data = chunk.encode(encoding)
+                f.write(data)
+                size += len(data)
+                if same:
+                    old = existing.read(len(data))
+                    compared += len(old)
+                    same = old == data
+            if same:
+                same = existing.read(1) == b''
+        if existing is not None:
+            existing.close()
+        record_read(compared)
+
+        if same:
+            os.unlink(tmp_name)
+            with _lock:
+                _stats['skipped'] += 1
+            return False
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        else:
+            os.chmod(tmp_name, 0o666 & ~_UMASK)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if existing is not None:
+            existing.close()
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    with _lock:
+        _stats['written'] += 1
+        _stats['bytes_written'] += size
+    return True
+
+
+def _same_content(path, data):
+    try:
+        if path.stat().st_size != len(data):
+            return False
+        with open(path, 'rb') as f:
+            existing = f.read()
+    except OSError:
+        return False
+    record_read(len(existing))
+    return existing == data
+
+
+def read_text(path, encoding='utf-8'):
+    """读取文本文件（计入读取字节数）"""
+    with open(path, 'r', encoding=encoding) as f:
+        content = f.read()
+        record_read(os.fstat(f.fileno()).st_size)
+    return content
+
+
+def record_read(size):
+    """记录从磁盘读取的字节数（用于 --profile 报告）"""
+    with _lock:
+        _stats['bytes_read'] += size
+
+
+def get_write_stats():
+    """返回写入统计的副本"""
+    with _lock:
+        return dict(_stats)
+
+
+def merge_write_stats(stats):
+    """把其他进程（如并行生成页面的工作进程）的写入统计累加到本进程"""
+    with _lock:
+        for key in _stats:
+            _stats[key] += stats.get(key, 0)
+
+
+def reset_write_stats():
+    """清零写入统计"""
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def write_summary():
+    """写入统计的简短说明"""
+    stats = get_write_stats()
+    return f"💾 写入 {stats['written']} 个文件，跳过 {stats['skipped']} 个未变化的文件"
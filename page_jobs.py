@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面生成阶段的并行执行
+要生成的页面拆成互不依赖的任务 (函数, 参数元组)，每个任务生成并写入一个页面（或一组页面）；
+jobs 大于 1 且任务足够多时，任务分批交给进程池执行，否则在本进程中依次执行。
+同时写文件的进程不超过 jobs 个，已提交未完成的批次不超过 jobs * 2 个，内存占用有上限；
+每个页面只由一个任务写入、内容只取决于任务参数，执行顺序不影响输出。
+任务函数必须是模块顶层函数（工作进程按名字找到它），工作进程的写入统计和渲染缓存命中次数会汇总到本进程；
+任务函数的返回值按任务顺序收集后返回（需要能在进程间传递）。
+批量导入笔记（batch_import_markdown.py）也用它把每篇笔记作为一个任务并行导入。
+"""
+
+import signal
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from output_writer import get_write_stats, reset_write_stats, merge_write_stats
+from render_cache import get_render_cache
+
+# 任务少于这个数时不启用进程池（进程间传递参数的开销超过收益）
+PARALLEL_MIN_TASKS = 16
+
+# 每批最多的任务数
+MAX_BATCH_SIZE = 64
+
+
+def _init_worker():
+    """工作进程忽略 Ctrl+C：由主进程取消还没有开始的批次，等正在执行的批次结束后退出"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _run_batch(batch):
+    """在工作进程中执行一批任务，返回 (各任务的返回值, 这批任务的写入统计, 渲染缓存命中次数, 未命中次数)"""
+    reset_write_stats()
+    cache = get_render_cache()
+    hits, misses = cache.hits, cache.misses
+    results = [func(*args) for func, args in batch]
+    return results, get_write_stats(), cache.hits - hits, cache.misses - misses
+
+
+def _collect(future):
+    """取回一批任务的返回值，同时累加写入统计和渲染缓存命中次数（在本进程中执行的任务已经直接计入）"""
+    results, stats, hits, misses = future.result()
+    merge_write_stats(stats)
+    cache = get_render_cache()
+    cache.hits += hits
+    cache.misses += misses
+    return results
+
+
+class PagePool:
+    """页面任务的执行器；进程池在第一次需要时创建，用完后调用 close()（或使用 with）"""
+
+    def __init__(self, jobs=1):
+        self.jobs = max(1, jobs)
+        self._executor = None
+
+    def run(self, tasks):
+        """执行任务列表，全部完成后按任务顺序返回各任务的返回值；任务中的异常会在这里重新抛出"""
+        return list(self.imap(tasks))
+
+    def imap(self, tasks, count=None):
+        """按任务顺序逐个产出各任务的返回值，每批任务完成后立即产出（可以边执行边汇报进度）
+
+        tasks 可以是生成器：同时传入任务数（的估计值）count 时，任务按批从生成器中取出，
+        内存中只有已提交未完成的批次。中途停止迭代时，还没有开始的批次会被取消
+        """
+        if count is None:
+            tasks = list(tasks)
+            count = len(tasks)
+        if self.jobs == 1 or count < PARALLEL_MIN_TASKS:
+            for func, args in tasks:
+                yield func(*args)
+            return
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker)
+        batch_size = max(1, min(MAX_BATCH_SIZE, count // (self.jobs * 4)))
+        tasks = iter(tasks)
+        pending = deque()
+        try:
+            while True:
+                batch = list(itertools.islice(tasks, batch_size))
+                if not batch:
+                    break
+                pending.append(self._executor.submit(_run_batch, batch))
+                if len(pending) >= self.jobs * 2:
+                    yield from _collect(pending.popleft())
+            while pending:
+                yield from _collect(pending.popleft())
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    def close(self, cancel=False):
+        """等待进程池退出；cancel 为 True 时先取消还没有开始的批次
+
+        关闭期间忽略 Ctrl+C：再次中断会让进程池收不到退出信号，工作进程一直等待新任务
+        """
+        if self._executor is None:
+            return
+        in_main_thread = threading.current_thread() is threading.main_thread()
+        if in_main_thread:
+            previous = signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            self._executor.shutdown(cancel_futures=cancel)
+            self._executor = None
+        finally:
+            if in_main_thread:
+                signal.signal(signal.SIGINT, previous)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(cancel=exc_type is not None)
+
+
+def run_page_tasks(tasks, pool=None):
+    """用 pool 执行页面任务，pool 为 None 时在本进程中依次执行；返回各任务的返回值"""
+    if pool is None:
+        return [func(*args) for func, args in tasks]
+    return pool.run(tasks)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面中由脚本生成的区域
+模板页面用成对的注释标出生成区域：
+
+    <!-- generated:posts -->
+    ...（每次构建时整体替换）
+    <!-- /generated:posts -->
+
+更新页面时从头到尾扫描一遍找到各个标记，只替换标记之间的内容，标记本身保留，下次构建还能找到；
+找不到标记时抛出 MissingRegionError，不会生成只替换了一部分的页面。
+"""
+
+from page_templates import Template
+
+
+class MissingRegionError(ValueError):
+    """模板页面中缺少生成区域的标记"""
+
+
+def start_marker(name):
+    return f"<!-- generated:{name} -->"
+
+
+def end_marker(name):
+    return f"<!-- /generated:{name} -->"
+
+
+def split_regions(content, names, source="页面"):
+    """按 names 的顺序（与区域在页面中出现的顺序一致）找到各区域
+
+    返回 (静态片段列表, 各区域原来的内容)；静态片段包含标记本身，比区域多一个。
+    每个标记都从上一个标记之后开始查找，整个页面只扫描一遍。
+    """
+    statics = []
+    regions = []
+    position = 0
+    for name in names:
+        start = content.find(start_marker(name), position)
+        if start == -1:
+            raise MissingRegionError(f"{source} 中缺少生成区域的开始标记 {start_marker(name)}")
+        start += len(start_marker(name))
+        end = content.find(end_marker(name), start)
+        if end == -1:
+            raise MissingRegionError(f"{source} 中缺少生成区域的结束标记 {end_marker(name)}")
+        statics.append(content[position:start])
+        regions.append(content[start:end])
+        position = end
+    statics.append(content[position:])
+    return statics, regions
+
+
+def compile_regions(content, names, source="页面"):
+    """把模板页面编译为以各生成区域为占位的 Template，同一模板生成多个分页时只需扫描一次"""
+    statics, _ = split_regions(content, names, source)
+    return Template.from_parts(statics, names)
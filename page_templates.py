@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预编译的页面模板
+每个布局在导入时解析一次，拆成静态片段和占位（`${name}`，`$$` 表示 `$` 本身）；
+生成页面时只需把各占位的值填入片段列表再拼接一次，不用重复拼接字符串。
+create_article_template.py、batch_import_markdown.py 和 update_blog.py 共用这里的布局，
+页面外框只有一份。占位不使用 `{}`，布局中的 Vue / JavaScript 代码不需要转义。
+"""
+
+import re
+
+_PLACEHOLDER = re.compile(r'\$(?:\{([A-Za-z_]\w*)\}|(\$))')
+
+
+class Template:
+    """解析一次、多次填充的模板"""
+
+    def __init__(self, source):
+        statics = []
+        names = []
+        static = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            static.append(source[position:match.start()])
+            position = match.end()
+            if match.group(2):
+                static.append('$')
+                continue
+            statics.append(''.join(static))
+            static = []
+            names.append(match.group(1))
+        static.append(source[position:])
+        statics.append(''.join(static))
+        self._build(statics, names)
+
+    @classmethod
+    def from_parts(cls, statics, names):
+        """由已经拆好的静态片段和占位名构造（statics 比 names 多一个，两者交替排列）"""
+        template = cls.__new__(cls)
+        template._build(statics, names)
+        return template
+
+    def _build(self, statics, names):
+        parts = []
+        slots = []
+        for static, name in zip(statics, names):
+            parts.append(static)
+            slots.append((len(parts), name))
+            parts.append(None)
+        parts.append(statics[-1])
+
+        self._parts = parts
+        self._slots = tuple(slots)
+        self.names = frozenset(names)
+
+    def _check(self, values):
+        missing = self.names.difference(values)
+        if missing:
+            raise KeyError(f"模板缺少变量: {', '.join(sorted(missing))}")
+
+    def render(self, **values):
+        """填充占位，返回完整文本；值可以是字符串或字符串序列（依次拼接）"""
+        self._check(values)
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            value = values[name]
+            parts[index] = value if isinstance(value, str) else ''.join(value)
+        return ''.join(parts)
+
+    def chunks(self, **values):
+        """逐段产出填充后的文本（用于 output_writer.write_chunks），
+        值为可迭代对象（如生成器）时逐项产出，不需要全部放在内存中
+        """
+        self._check(values)
+        return self._iter_chunks(values)
+
+    def _iter_chunks(self, values):
+        slots = iter(self._slots)
+        next_slot = next(slots, None)
+        for index, part in enumerate(self._parts):
+            if next_slot is not None and index == next_slot[0]:
+                value = values[next_slot[1]]
+                if isinstance(value, str):
+                    yield value
+                else:
+                    yield from value
+                next_slot = next(slots, None)
+            elif part:
+                yield part
+
+
+# 用 Markdown 工具创建的文章页面（完整的 Gridea 主题外框）
+ARTICLE_PAGE = Template("""<!DOCTYPE html>
+<html>
+  <head>
+    <meta charset="utf-8" >
+
+<title>${title} | Gridea</title>
+
+<meta name="viewport" content="width=device-width, initial-scale=1, maximum-scale=1, user-scalable=no">
+
+<link rel="stylesheet" href="https://use.fontawesome.com/releases/v5.7.2/css/all.css" integrity="sha384-fnmOCqbTlWIlj8LyTjo7mOUStjsKC4pOpQbqyi7RrhN7udi9RwhKkMHpvLbHG9Sr" crossorigin="anonymous">
+<link rel="shortcut icon" href="../../favicon.ico?v=1659011765580">
+<link rel="stylesheet" href="../../styles/main.css">
+
+
+
+<link rel="stylesheet" href="https://unpkg.com/aos@next/dist/aos.css" />
+<script src="https://cdn.jsdelivr.net/npm/vue/dist/vue.js"></script>
+
+
+
+    <meta name="description" content="${description}" />
+    <meta name="keywords" content="${keywords}" />
+  </head>
+  <body>
+    <div id="app" class="main">
+
+      <div class="sidebar" :class="{ 'full-height': menuVisible }">
+  <div class="top-container" data-aos="fade-right">
+    <div class="top-header-container">
+      <a class="site-title-container" href="/">
+        <img src="../../images/avatar.png?v=1659011765580" class="site-logo">
+        <h1 class="site-title">Gridea</h1>
+      </a>
+      <div class="menu-btn" @click="menuVisible = !menuVisible">
+        <div class="line"></div>
+      </div>
+    </div>
+    <div>
+      
+        
+          <a href="/" class="site-nav">
+            首页
+          </a>
+        
+      
+        
+          <a href="/archives" class="site-nav">
+            归档
+          </a>
+        
+      
+        
+          <a href="/tags" class="site-nav">
+            标签
+          </a>
+        
+      
+        
+          <a href="/post/about" class="site-nav">
+            关于
+          </a>
+        
+      
+    </div>
+  </div>
+  <div class="bottom-container" data-aos="flip-up" data-aos-offset="0">
+    <div class="social-container">
+      
+        
+      
+        
+      
+        
+      
+        
+      
+        
+      
+    </div>
+    <div class="site-description">
+      温故而知新
+    </div>
+    <div class="site-footer">
+      Powered by <a href="https://github.com/getgridea/gridea" target="_blank">Gridea</a> | <a class="rss" href="../../atom.xml" target="_blank">RSS</a>
+    </div>
+  </div>
+</div>
+
+
+      <div class="main-container">
+        <div class="content-container" data-aos="fade-up">
+          <div class="post-detail">
+            <h2 class="post-title">${title}</h2>
+            <div class="post-date">${date}</div>
+            
+            <div class="post-content" v-pre>
+              ${content}
+            </div>
+            
+            ${tags}
+            
+
+            
+
+          </div>
+
+        </div>
+      </div>
+    </div>
+
+    <script src="https://unpkg.com/aos@next/dist/aos.js"></script>
+<script type="application/javascript">
+
+AOS.init();
+
+var app = new Vue({
+  el: '#app',
+  data: {
+    menuVisible: false,
+  },
+})
+
+</script>
+
+
+
+
+  </body>
+</html>""")
+
+# 文章页面底部的标签列表（没有标签时整段为空）
+ARTICLE_TAGS = Template("""
+              <div class="tag-container">
+                ${links}
+              </div>""")
+
+ARTICLE_TAG_LINK = Template('<a href="../../tag/${tag}/" class="tag">${tag}</a>')
+
+# 简化外框：批量导入的文章和标签详情页共用；logo 为站点头像一行（可以为空）
+SIMPLE_PAGE = Template("""<!DOCTYPE html>
+<html>
+  <head>
+    <meta charset="utf-8">
+    <title>${title} | Gridea</title>
+    <meta name="viewport" content="width=device-width, initial-scale=1, maximum-scale=1, user-scalable=no">
+    <link rel="stylesheet" href="../../styles/main.css">
+  </head>
+  <body>
+    <div class="main">
+      <div class="sidebar">
+        <div class="top-container">
+          <div class="top-header-container">
+            <a class="site-title-container" href="/">
+${logo}              <h1 class="site-title">Gridea</h1>
+            </a>
+          </div>
+          <div>
+            <a href="/" class="site-nav">首页</a>
+            <a href="/archives" class="site-nav">归档</a>
+            <a href="/tags" class="site-nav">标签</a>
+            <a href="/post/about" class="site-nav">关于</a>
+          </div>
+        </div>
+      </div>
+      
+      <div class="main-container">
+        <div class="content-container">
+${content}
+        </div>
+      </div>
+    </div>
+  </body>
+</html>""")
+
+SITE_LOGO = '              <img src="../../images/avatar.png?v=1659011765580" class="site-logo">\n'
+
+# 批量导入的文章正文
+SIMPLE_POST = Template("""          <div class="post-detail">
+            <h2 class="post-title">${title}</h2>
+            <div class="post-date">${date}</div>
+            <div class="post-content">
+              ${content}
+            </div>
+          </div>""")
+
+# 标签详情页的标题，文章列表紧随其后
+TAG_HEADING = Template("""          <h2 class="current-tag">标签: ${tag}</h2>
+          """)
+
+# 首页和标签详情页的文章条目
+POST_ITEM = Template("""
+            <article class="post-item">
+              <div class="left">
+                <a href="${href}">
+                  <h2 class="post-title">${title}</h2>
+                </a>
+                <div class="post-date">
+                  ${date}
+                </div>
+                <div class="post-abstract">
+                  <p>${abstract}</p>
+                </div>
+              </div>
+            </article>
+        """)
+
+# 归档页面的年份标题和文章条目
+ARCHIVE_YEAR = Template('<h2 class="year" data-aos="fade-in" data-aos-delay="500">${year}</h2>\n')
+
+ARCHIVE_ITEM = Template("""
+                <article class="post">
+                  <a href="../${path}">
+                    <h2 class="post-title">${title}</h2>
+                  </a>
+                </article>
+            """)
+
+# 标签列表页面的标签链接
+TAG_LINK = Template('<a class="tag" href="../tag/${slug}/">${tag}</a>\n')
+
+# RSS（Atom）订阅源
+RSS_FEED = Template("""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <id>.</id>
+    <title>Gridea</title>
+    <updated>${updated}</updated>
+    <generator>https://github.com/jpmonette/feed</generator>
+    <link rel="alternate" href="."/>
+    <link rel="self" href="./atom.xml"/>
+    <subtitle>温故而知新</subtitle>
+    <logo>./images/avatar.png</logo>
+    <icon>./favicon.ico</icon>
+    <rights>All rights reserved ${year}, Gridea</rights>${entries}
+</feed>""")
+
+RSS_ENTRY = Template("""
+    <entry>
+        <title type="html"><![CDATA[${title}]]></title>
+        <id>./${path}</id>
+        <link href="./${path}">
+        </link>
+        <updated>${date}T12:00:00.000Z</updated>
+        <summary type="html"><![CDATA[<p>${abstract}</p>]]></summary>
+    </entry>""")
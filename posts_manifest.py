@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章清单 posts.json
+构建时根据扫描结果生成一个紧凑的 JSON 清单，页面脚本只需下载这一个文件就能列出所有文章，
+不再抓取 post 目录的列表页、逐篇下载 Markdown 解析 front matter。
+
+格式（文章按时间排序，最新的在前，每篇一行）：
+{"version":1,"posts":[
+{"slug":...,"title":...,"date":...,"tags":[...],"abstract":...,"path":"./post/x/","source":"post/x.md","hash":"..."},
+...
+]}
+
+source 只有 Markdown 文章才有（页面脚本按需下载正文）；hash 是源文件内容哈希的前 HASH_LENGTH 位，
+内容不变时不变，页面脚本把它拼在下载地址后面，浏览器可以放心缓存文章正文。
+"""
+
+import json
+from pathlib import Path
+
+from output_writer import write_chunks
+
+POSTS_MANIFEST = Path("posts.json")
+MANIFEST_VERSION = 1
+HASH_LENGTH = 16
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def source_key(article):
+    """文章源文件在构建清单中的键：Markdown 文章为 source_file，HTML 文章为路径下的 index.html"""
+    return article.get('source_file') or f"{article['path'][2:]}index.html"
+
+
+def post_record(article, digest):
+    """一篇文章在 posts.json 中的记录，digest 为源文件的内容哈希（未知时为 None）"""
+    record = {
+        'slug': article['slug'],
+        'title': article['title'],
+        'date': article['date'],
+        'tags': list(article['tags']),
+        'abstract': article['abstract'],
+        'path': article['path'],
+    }
+    if article.get('type') == 'markdown':
+        record['source'] = Path(article['source_file']).as_posix()
+    record['hash'] = digest[:HASH_LENGTH] if digest else None
+    return record
+
+
+def manifest_chunks(records):
+    """逐段产出 posts.json 的内容，records 可以是生成器"""
+    yield f'{{"version":{MANIFEST_VERSION},"posts":['
+    separator = '\n'
+    for record in records:
+        yield separator
+        yield _encode(record)
+        separator = ',\n'
+    yield '\n]}\n'
+
+
+def write_posts_manifest(articles, sources, path=POSTS_MANIFEST):
+    """写入 posts.json（内容未变化时跳过），返回文章数
+
+    articles 为排好序的文章（可以是生成器），内容哈希从构建清单的 sources 中查找；
+    文章记录中自带 hash 字段时（流式构建）直接使用。
+    """
+    count = 0
+
+    def records():
+        nonlocal count
+        for article in articles:
+            digest = article.get('hash')
+            if digest is None:
+                digest = sources.get(source_key(article), {}).get('hash')
+            count += 1
+            yield post_record(article, digest)
+
+    print("🗂️ 更新文章清单...")
+    write_chunks(path, manifest_chunks(records()))
+    print(f"✅ 文章清单更新完成（{count} 篇）")
+    return count
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markdown 渲染缓存
+以（内容哈希、渲染器版本、渲染选项）为键，把渲染结果保存在磁盘上。
+渲染器版本变化时旧缓存自动失效；总大小超过上限时按最近使用时间淘汰。
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from pathlib import Path
+
+from markdown_renderer import RENDERER_VERSION, render_markdown
+
+DEFAULT_CACHE_DIR = Path(".build_cache") / "render"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# 淘汰时清理到上限的该比例，避免每次写入都触发淘汰
+EVICT_TARGET_RATIO = 0.8
+
+
+class RenderCache:
+    """磁盘上的 Markdown 渲染结果缓存"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(cache_dir)
+        self.directory = self.root / f"v{RENDERER_VERSION}"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = None
+        self._checked_versions = False
+
+    def render(self, markdown_content, **options):
+        """返回渲染后的 HTML，命中缓存时不再重新渲染"""
+        path = self._entry_path(markdown_content, options)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                html = f.read()
+        except OSError:
+            html = None
+
+        if html is not None:
+            self.hits += 1
+            try:
+                # 更新访问时间，用于 LRU 淘汰
+                os.utime(path)
+            except OSError:
+                pass
+            return html
+
+        self.misses += 1
+        html = render_markdown(markdown_content, **options)
+        try:
+            self._store(path, html)
+        except OSError as e:
+            print(f"⚠️  写入渲染缓存失败: {e}")
+        return html
+
+    def summary(self):
+        """命中/未命中统计"""
+        return f"🗃️  渲染缓存：命中 {self.hits} 次，未命中 {self.misses} 次"
+
+    def evict(self):
+        """按最近使用时间淘汰缓存，直到总大小低于上限"""
+        entries = []
+        total = 0
+        for path in self.directory.glob('*/*.html'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                except OSError:
+                    pass
+        self._total_bytes = total
+
+    def clear(self):
+        """删除全部缓存"""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._total_bytes = 0
+
+    def _entry_path(self, markdown_content, options):
+        digest = hashlib.sha256()
+        digest.update(RENDERER_VERSION.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(markdown_content.encode('utf-8'))
+        key = digest.hexdigest()
+        return self.directory / key[:2] / f"{key}.html"
+
+    def _drop_stale_versions(self):
+        """删除其他渲染器版本留下的缓存"""
+        self._checked_versions = True
+        if not self.root.is_dir():
+            return
+        for child in self.root.iterdir():
+            if child.is_dir() and child.name != self.directory.name:
+                shutil.rmtree(child, ignore_errors=True)
+
+    def _store(self, path, html):
+        if not self._checked_versions:
+            self._drop_stale_versions()
+        if self._total_bytes is None:
+            self.evict()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = html.encode('utf-8')
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._total_bytes += len(data)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+
+_default_cache = None
+
+
+def get_render_cache():
+    """进程内共享的默认渲染缓存"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RenderCache()
+    return _default_cache
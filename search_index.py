@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+站内搜索索引
+构建时把文章标题、摘要、标签切分成词（中日韩文字按二元组切分，拉丁字母和数字按单词切分），
+生成分片的倒排索引 JSON，浏览器只需下载查询词所在的分片。
+
+输出目录结构：
+search/meta.json          索引版本、分片数、文档数
+search/shards/N.json      词 → 文档编号（差分编码）
+search/docs/N.json        文档信息（每 DOC_CHUNK_SIZE 篇一个文件）
+"""
+
+import re
+import json
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from output_writer import write_text
+
+SEARCH_DIR = Path("search")
+INDEX_VERSION = 1
+SHARD_COUNT = 64
+DOC_CHUNK_SIZE = 500
+
+# 单个分片超过该大小时在报告中提示
+SHARD_BUDGET_BYTES = 64 * 1024
+
+# 与 search/index.html 中的 TOKEN_RE 保持一致
+_TOKEN_RE = re.compile(r'[a-z0-9]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+')
+
+
+def tokenize(text):
+    """切分搜索词：中日韩文字取相邻二元组，拉丁字母和数字取整个单词"""
+    tokens = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if run[0] < '\u0080':
+            if len(run) > 1 or run.isdigit():
+                tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+@lru_cache(maxsize=None)
+def shard_of(token, shard_count=SHARD_COUNT):
+    """词所在的分片（FNV-1a 哈希，与页面脚本中的实现一致）"""
+    h = 2166136261
+    for ch in token:
+        h ^= ord(ch)
+        h = (h * 16777619) & 0xffffffff
+    return h % shard_count
+
+
+@lru_cache(maxsize=65536)
+def _document_postings(text, shard_count):
+    """文档去重后的 (分片, 词) 列表（带缓存，watch 模式反复重建时未修改的文章不再重新切分）"""
+    return tuple((shard_of(token, shard_count), token) for token in dict.fromkeys(tokenize(text)))
+
+
+def build_search_index(articles, shard_count=SHARD_COUNT):
+    """构建分片倒排索引，返回 (分片列表, 文档列表)"""
+    shards = [{} for _ in range(shard_count)]
+    docs = []
+    for doc_id, article in enumerate(articles):
+        docs.append([article['title'], article['path'], article['date']])
+        text = ' '.join([article['title'], article['abstract'], ' '.join(article['tags'])])
+        for shard, token in _document_postings(text, shard_count):
+            shards[shard].setdefault(token, []).append(doc_id)
+
+    for shard in shards:
+        _delta_encode(shard)
+    return shards, docs
+
+
+def _dump(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+def _remove_stale(directory, keep_count):
+    """删除编号超出范围的旧 JSON 文件"""
+    if not directory.is_dir():
+        return
+    for path in directory.glob('*.json'):
+        if not path.stem.isdigit() or int(path.stem) >= keep_count:
+            path.unlink()
+
+
+def _delta_encode(shard):
+    """文档编号递增，存储差值以减小体积"""
+    for token, ids in shard.items():
+        shard[token] = [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+    return shard
+
+
+def _write_json(path, data):
+    """写入 JSON 文件，返回字节数"""
+    text = _dump(data)
+    write_text(path, text)
+    return len(text.encode('utf-8'))
+
+
+def _write_in_memory(articles, search_dir):
+    """在内存中构建整个索引后写入，返回 (分片大小列表, 文档块大小列表, 词条数, 文档数)"""
+    shards, docs = build_search_index(articles)
+    shard_sizes = [_write_json(search_dir / 'shards' / f'{number}.json', shard)
+                   for number, shard in enumerate(shards)]
+    chunk_sizes = [_write_json(search_dir / 'docs' / f'{number}.json', docs[i:i + DOC_CHUNK_SIZE])
+                   for number, i in enumerate(range(0, len(docs), DOC_CHUNK_SIZE))]
+    return shard_sizes, chunk_sizes, sum(len(shard) for shard in shards), len(docs)
+
+
+def _write_spilled(articles, search_dir, spill_dir, shard_count=SHARD_COUNT):
+    """倒排表先按分片追加到临时文件，再逐个分片生成；内存中最多只有一个分片和一块文档信息
+
+    返回值与 _write_in_memory 相同，生成的文件也完全相同
+    """
+    spill_dir = Path(spill_dir)
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix="search-", dir=spill_dir))
+    try:
+        files = [open(work_dir / f'{number}.tsv', 'w', encoding='utf-8') for number in range(shard_count)]
+        chunk_sizes = []
+        chunk = []
+        doc_count = 0
+        try:
+            for doc_id, article in enumerate(articles):
+                chunk.append([article['title'], article['path'], article['date']])
+                if len(chunk) == DOC_CHUNK_SIZE:
+                    chunk_sizes.append(_write_json(search_dir / 'docs' / f'{len(chunk_sizes)}.json', chunk))
+                    chunk = []
+                text = ' '.join([article['title'], article['abstract'], ' '.join(article['tags'])])
+                # 不使用缓存，避免缓存随文章数增长
+                for shard, token in _document_postings.__wrapped__(text, shard_count):
+                    files[shard].write(f'{token}\t{doc_id}\n')
+                doc_count = doc_id + 1
+        finally:
+            for f in files:
+                f.close()
+        if chunk:
+            chunk_sizes.append(_write_json(search_dir / 'docs' / f'{len(chunk_sizes)}.json', chunk))
+
+        shard_sizes = []
+        token_count = 0
+        for number in range(shard_count):
+            shard = {}
+            with open(work_dir / f'{number}.tsv', 'r', encoding='utf-8') as f:
+                for line in f:
+                    token, doc_id = line.rstrip('\n').split('\t')
+                    shard.setdefault(token, []).append(int(doc_id))
+            token_count += len(shard)
+            shard_sizes.append(_write_json(search_dir / 'shards' / f'{number}.json', _delta_encode(shard)))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return shard_sizes, chunk_sizes, token_count, doc_count
+
+
+def update_search_index(articles, search_dir=SEARCH_DIR, spill_dir=None):
+    """生成搜索索引文件并输出体积报告
+
+    articles 可以是生成器；传入临时目录 spill_dir 时（流式构建）倒排表先写入磁盘，
+    内存占用不随文章数增长
+    """
+    print("🔎 更新搜索索引...")
+    search_dir = Path(search_dir)
+
+    if spill_dir is None:
+        shard_sizes, chunk_sizes, token_count, doc_count = _write_in_memory(articles, search_dir)
+    else:
+        shard_sizes, chunk_sizes, token_count, doc_count = _write_spilled(articles, search_dir, spill_dir)
+
+    meta = {
+        'version': INDEX_VERSION,
+        'shards': len(shard_sizes),
+        'docs': doc_count,
+        'doc_chunk_size': DOC_CHUNK_SIZE,
+    }
+    write_text(search_dir / 'meta.json', _dump(meta))
+
+    _remove_stale(search_dir / 'shards', len(shard_sizes))
+    _remove_stale(search_dir / 'docs', len(chunk_sizes))
+
+    # 体积报告
+    print(f"   词条 {token_count} 个，分片 {len(shard_sizes)} 个，文档 {doc_count} 篇")
+    print(f"   分片总计 {sum(shard_sizes) / 1024:.1f}KB，最大 {max(shard_sizes) / 1024:.1f}KB，"
+          f"文档信息总计 {sum(chunk_sizes) / 1024:.1f}KB")
+    over_budget = [n for n, size in enumerate(shard_sizes) if size > SHARD_BUDGET_BYTES]
+    if over_budget:
+        print(f"⚠️  {len(over_budget)} 个分片超过 {SHARD_BUDGET_BYTES // 1024}KB，可以增大 SHARD_COUNT")
+    print("✅ 搜索索引更新完成")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+batch_import_markdown 的重复导入测试：笔记改名、变成重复内容后，原来的文章页面被删除
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import article_store
+from article_store import ArticleStore
+from batch_import_markdown import batch_import_markdown
+
+
+class ReimportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.root = tempfile.mkdtemp(prefix="blog-test-")
+        os.chdir(self.root)
+        Path("notes").mkdir()
+        self.store = article_store._default_store = ArticleStore()
+
+    def tearDown(self):
+        self.store.close()
+        article_store._default_store = None
+        os.chdir(self.cwd)
+        shutil.rmtree(self.root)
+
+    def write_note(self, name, text):
+        path = Path("notes") / name
+        path.write_text(text, encoding='utf-8')
+        # 修改时间的精度可能不够区分两次写入，直接改变大小和修改时间
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def import_notes(self):
+        self.assertTrue(batch_import_markdown("notes", verbose=False))
+
+    def test_renamed_note_removes_old_page(self):
+        self.write_note("a.md", "# Old Title\n\n正文\n")
+        self.import_notes()
+        self.assertTrue(Path("post/old-title/index.html").exists())
+
+        self.write_note("a.md", "# New Title\n\n正文\n")
+        self.import_notes()
+        self.assertTrue(Path("post/new-title/index.html").exists())
+        self.assertFalse(Path("post/old-title").exists())
+
+        # 原来的 slug 已经释放，可以分配给别的笔记
+        self.write_note("b.md", "# Old Title\n\n另一篇\n")
+        self.import_notes()
+        self.assertTrue(Path("post/old-title/index.html").exists())
+        self.assertTrue(Path("post/new-title/index.html").exists())
+
+    def test_note_turned_duplicate_removes_its_page(self):
+        self.write_note("a.md", "# Same\n\n正文\n")
+        self.write_note("b.md", "# Other\n\n别的正文\n")
+        self.import_notes()
+        self.assertTrue(Path("post/other/index.html").exists())
+
+        self.write_note("b.md", "# Same\n\n正文\n")
+        self.import_notes()
+        self.assertFalse(Path("post/other").exists())
+        self.assertTrue(Path("post/same/index.html").exists())
+
+    def test_unchanged_title_keeps_page(self):
+        self.write_note("a.md", "# Title\n\n正文\n")
+        self.import_notes()
+        self.write_note("a.md", "# Title\n\n修改后的正文\n")
+        self.import_notes()
+        self.assertTrue(Path("post/title/index.html").exists())
+        self.assertEqual(sorted(os.listdir("post")), ["title"])
+
+
+if __name__ == '__main__':
+    unittest.main()
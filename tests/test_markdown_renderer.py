@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+markdown_renderer 的强调标记（* 和 _）测试
+嵌套、相邻的粗体和斜体按 CommonMark 的分隔符栈规则配对
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from markdown_renderer import render_inline, render_markdown
+
+
+class EmphasisTest(unittest.TestCase):
+
+    def assertInline(self, text, expected):
+        self.assertEqual(render_inline(text), expected)
+
+    def test_simple(self):
+        self.assertInline('**粗体** 和 *斜体*', '<strong>粗体</strong> 和 <em>斜体</em>')
+        self.assertInline('__粗体__ 和 _斜体_', '<strong>粗体</strong> 和 <em>斜体</em>')
+
+    def test_strong_inside_em(self):
+        self.assertInline('*中文**粗体**结尾*', '<em>中文<strong>粗体</strong>结尾</em>')
+        self.assertInline('*italic with **bold** inside*', '<em>italic with <strong>bold</strong> inside</em>')
+        self.assertInline('_a __b__ c_', '<em>a <strong>b</strong> c</em>')
+
+    def test_em_inside_strong(self):
+        self.assertInline('**a *b* c**', '<strong>a <em>b</em> c</strong>')
+        self.assertInline('**粗体*斜体*结尾**', '<strong>粗体<em>斜体</em>结尾</strong>')
+        self.assertInline('__a _b_ c__', '<strong>a <em>b</em> c</strong>')
+
+    def test_triple(self):
+        self.assertInline('***x***', '<em><strong>x</strong></em>')
+        self.assertInline('***a** b*', '<em><strong>a</strong> b</em>')
+        self.assertInline('***a* b**', '<strong><em>a</em> b</strong>')
+        self.assertInline('___x___', '<em><strong>x</strong></em>')
+
+    def test_adjacent(self):
+        self.assertInline('*a*b*c*', '<em>a</em>b<em>c</em>')
+        self.assertInline('**a** **b**', '<strong>a</strong> <strong>b</strong>')
+        self.assertInline('**a****b**', '<strong>a****b</strong>')
+        self.assertInline('这是**重点**内容', '这是<strong>重点</strong>内容')
+        self.assertInline('**a**_b_', '<strong>a</strong><em>b</em>')
+        self.assertInline('*a* **b** ***c***', '<em>a</em> <strong>b</strong> <em><strong>c</strong></em>')
+
+    def test_unmatched(self):
+        self.assertInline('**foo*bar**', '<strong>foo*bar</strong>')
+        self.assertInline('*a **b*', '*a *<em>b</em>')
+        self.assertInline('a * b * c', 'a * b * c')
+        self.assertInline('**没有结束', '**没有结束')
+
+    def test_intraword_underscore(self):
+        self.assertInline('snake_case_name', 'snake_case_name')
+        self.assertInline('__init__ 方法', '<strong>init</strong> 方法')
+        self.assertInline('foo_bar_', 'foo_bar_')
+
+    def test_punctuation(self):
+        self.assertInline('（**粗体**）', '（<strong>粗体</strong>）')
+        self.assertInline('a**"x"**b', 'a**"x"**b')
+
+    def test_code_and_links_are_opaque(self):
+        self.assertInline('**x`y`a**b**', '<strong>x<code>y</code>a</strong>b**')
+        self.assertInline('*a `*` b*', '<em>a <code>*</code> b</em>')
+        self.assertInline('*[链接](https://example.com)*', '<em><a href="https://example.com">链接</a></em>')
+
+    def test_escaped_delimiters(self):
+        self.assertInline(r'\*a\*', '*a*')
+        self.assertInline(r'\**a*', '*<em>a</em>')
+
+    def test_paragraph_line_breaks(self):
+        self.assertEqual(render_markdown('*第一行\n第二行*'), '<p><em>第一行<br>\n第二行</em></p>')
+
+
+if __name__ == '__main__':
+    unittest.main()
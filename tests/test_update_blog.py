@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+update_blog 的增量构建测试：在临时目录中生成页面，检查删除、改名后遗留的页面被清理
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import update_blog
+from article_index import Article, ArticleIndex
+
+
+def make_article(slug, tags):
+    return Article(slug, f"标题 {slug}", "2024-01-01", "摘要", tags, path=f"post/{slug}/")
+
+
+class SiteDirTest(unittest.TestCase):
+    """在带有页面模板的临时目录中运行"""
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.root = tempfile.mkdtemp(prefix="blog-test-")
+        (Path(self.root) / "tags").mkdir()
+        shutil.copy(ROOT / "tags" / "index.html", Path(self.root) / "tags" / "index.html")
+        os.chdir(self.root)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.root)
+
+
+class RebaseLinksTest(unittest.TestCase):
+
+    def assertRebased(self, href, expected, depth=1):
+        self.assertEqual(update_blog.rebase_links(f'<a href="{href}">', depth), f'<a href="{expected}">')
+
+    def test_relative_links(self):
+        self.assertRebased("./a/", "../a/")
+        self.assertRebased("../a/", "../../a/")
+        self.assertRebased("./", "../")
+        self.assertRebased("./post/a/", "../../post/a/", depth=2)
+
+    def test_bare_relative_links(self):
+        self.assertRebased("images/a.png", "../images/a.png")
+        self.assertRebased("other-post/", "../../other-post/", depth=2)
+        self.assertEqual(update_blog.rebase_links('<img src="a.png" alt="">', 1), '<img src="../a.png" alt="">')
+
+    def test_absolute_links_unchanged(self):
+        for href in ("https://example.com/", "mailto:a@example.com", "/about/", "//cdn.example.com/a.js",
+                     "#section", "?page=2", ""):
+            self.assertRebased(href, href)
+
+
+class UpdateTagsTest(SiteDirTest):
+
+    def update_tags(self, manifest, articles):
+        update_blog.update_tags(None, manifest, index=ArticleIndex(articles))
+
+    def test_removes_page_of_tag_without_articles(self):
+        manifest = {'tags': {}}
+        self.update_tags(manifest, [make_article("a", ["Python", "部署"]), make_article("b", ["部署"])])
+        self.assertTrue(Path("tag/Python/index.html").exists())
+
+        # a 去掉了 Python 标签，Python 不再有文章
+        self.update_tags(manifest, [make_article("a", ["部署"]), make_article("b", ["部署"])])
+        self.assertFalse(Path("tag/Python").exists())
+        self.assertTrue(Path("tag/部署/index.html").exists())
+        self.assertEqual(set(manifest['tags']), {"部署"})
+
+    def test_keeps_page_whose_slug_is_still_used(self):
+        manifest = {'tags': {}}
+        self.update_tags(manifest, [make_article("a", ["C++"]), make_article("b", ["C"])])
+        self.update_tags(manifest, [make_article("b", ["C"])])
+        self.assertTrue(Path("tag/C/index.html").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
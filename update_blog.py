@@ -5,28 +5,81 @@
 自动扫描新文章并更新首页、归档、标签、RSS等页面
 """
 
+import io
 import os
 import re
 import json
+import shutil
+import hashlib
+import argparse
 import datetime
+import functools
+import itertools
+import threading
+import time
+import http.server
 from pathlib import Path
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from output_writer import write_text, write_chunks, read_text, record_read, get_write_stats, write_summary, reset_write_stats
+from render_cache import get_render_cache
+from search_index import update_search_index
+from posts_manifest import write_posts_manifest
+from front_matter import read_front_matter
+from html_meta import read_post_meta, parse_post_meta
+from article_store import get_article_store
+from external_sort import ExternalSorter, TopK
+from article_index import ArticleIndex, compact_article
+from create_article_template import markdown_to_html, render_article_page
+from page_jobs import PagePool, run_page_tasks
+from page_regions import MissingRegionError, compile_regions, split_regions
+from page_templates import (POST_ITEM, ARCHIVE_YEAR, ARCHIVE_ITEM, TAG_LINK, TAG_HEADING, SITE_LOGO,
+                            SIMPLE_PAGE, RSS_FEED, RSS_ENTRY)
+from build_profiler import (DEFAULT_TOP_N, start_profiling, finish_profiling, profiling_enabled,
+                            profile_phase, record_parse_time)
+
+# 构建缓存目录与清单（记录每个源文件的大小、修改时间、内容哈希和提取的元数据）
+CACHE_DIR = Path(".build_cache")
+PROFILE_FILE = CACHE_DIR / "profile.json"
+
+# 首页和归档页面每页显示的文章数
+HOMEPAGE_PAGE_SIZE = 5
+ARCHIVE_PAGE_SIZE = 100
+
+# RSS 中包含的最新文章数
+RSS_SIZE = 10
+
+# 待解析文件少于该数量时串行解析，避免进程池的启动开销
+PARALLEL_MIN_SOURCES = 16
+
+# Markdown 文章没有 excerpt 时，读取正文开头的字符数（用于提取第一段作为摘要）
+EXCERPT_PREFIX_CHARS = 4096
+
+# 流式构建（--stream）每批检查的源文件数
+STREAM_BATCH_SIZE = 2000
+
+# watch 模式轮询 post 目录的默认间隔（秒）
+WATCH_INTERVAL = 0.3
+
+# 扫描 post 目录时忽略的文件和目录（另外以 . 开头的隐藏文件和目录、以 ~ 结尾的临时文件也会忽略）
+IGNORED_NAMES = frozenset({'Thumbs.db', 'desktop.ini', '__MACOSX'})
 
 def extract_abstract_from_content(content):
     """从文章内容中智能提取摘要"""
+    return abstract_from_meta(parse_post_meta(content))
+
+def abstract_from_meta(meta):
+    """由页面元数据（见 html_meta）确定摘要"""
     try:
         # 方法1: 尝试从现有的 post-abstract 中提取
-        abstract_match = re.search(r'<div class="post-abstract">.*?<p>(.+?)</p>', content, re.DOTALL)
-        if abstract_match:
-            abstract = abstract_match.group(1).strip()
+        if meta.abstract_paragraph is not None:
+            abstract = meta.abstract_paragraph.strip()
             if abstract and abstract != "暂无摘要":
                 return clean_html_tags(abstract)
         
         # 方法2: 从文章内容中提取第一段
-        # 查找第一个 <p> 标签
-        first_p_match = re.search(r'<div class="post-content">.*?<p>(.+?)</p>', content, re.DOTALL)
-        if first_p_match:
-            first_paragraph = first_p_match.group(1).strip()
+        if meta.content_paragraph is not None:
+            first_paragraph = meta.content_paragraph.strip()
             if first_paragraph:
                 # 清理HTML标签
                 clean_text = clean_html_tags(first_paragraph)
@@ -36,9 +89,8 @@ def extract_abstract_from_content(content):
                 return clean_text
         
         # 方法3: 从meta keywords中提取
-        meta_match = re.search(r'<meta name="keywords" content="(.+?)"', content)
-        if meta_match:
-            meta_content = meta_match.group(1).strip()
+        if meta.keywords:
+            meta_content = meta.keywords.strip()
             if meta_content:
                 return clean_html_tags(meta_content)
         
@@ -58,8 +110,183 @@ def clean_html_tags(text):
     text = re.sub(r'\s+', ' ', text).strip()
     return text
 
-def scan_articles():
-    """扫描所有文章"""
+def load_manifest():
+    """从文章元数据库加载构建清单（数据库版本不匹配时为空清单）"""
+    return get_article_store().load_manifest()
+
+def save_manifest(manifest):
+    """把构建清单的变化写入文章元数据库并提交（只更新有变化的行）"""
+    get_article_store().save_manifest(manifest)
+
+def is_ignored(name):
+    """扫描 post 目录时是否忽略该文件或目录（如 .DS_Store、.git、编辑器的临时文件）"""
+    return name.startswith('.') or name.endswith('~') or name in IGNORED_NAMES
+
+def iter_sources(post_dir, directories=None):
+    """逐个产出 post 目录下的文章源文件 (类型, 文件路径, slug, 文章路径)，文章路径为 None 时使用默认路径
+
+    顺序为：.md 文件、.markdown 文件、文章目录中的 index.html（均按目录遍历顺序）。
+    与 Markdown 文章同名的目录和带有预渲染标记的页面是预渲染输出（见 update_post_pages），不作为 HTML 文章。
+    传入 directories 列表时，会在其中记录查看过的文章目录（watch 模式据此轮询新增文件）。
+    """
+    markdown_alt_files = []
+    markdown_stems = set()
+    article_dirs = []
+    
+    # 只遍历一次 post 目录，目录项自带类型信息，不需要逐个 stat；.md 文件边遍历边产出
+    with os.scandir(post_dir) as entries:
+        for entry in entries:
+            if is_ignored(entry.name):
+                continue
+            if entry.is_dir():
+                article_dirs.append(entry.name)
+            elif entry.name.endswith('.md'):
+                md_file = post_dir / entry.name
+                markdown_stems.add(md_file.stem)
+                yield ('markdown', md_file, md_file.stem, None)
+            elif entry.name.endswith('.markdown'):
+                markdown_alt_files.append(entry.name)
+                markdown_stems.add(entry.name[:-len('.markdown')])
+    
+    for name in markdown_alt_files:
+        md_file = post_dir / name
+        yield ('markdown', md_file, md_file.stem, None)
+    
+    # HTML 文件（兼容旧格式）
+    for name in article_dirs:
+        if name not in markdown_stems:
+            yield from iter_article_dir(post_dir / name, name, None, directories)
+
+def iter_article_dir(article_dir, slug, path, directories=None):
+    """逐个产出文章目录（任意嵌套深度）中的 HTML 文章，参见 iter_sources
+
+    目录中有 index.html 时它就是一篇文章，不再查看子目录；否则依次查看各个子目录。
+    嵌套目录中的文章使用顶层文章目录名作为 slug，路径指向 index.html 所在的目录。
+    index.html 是否存在由读取它开头的预渲染标记顺带判断，不单独 stat；只有没有 index.html 的目录才列出，
+    子目录由目录项的类型判断。与 os.walk 相同，不进入指向目录的符号链接（避免循环链接导致无限遍历）
+    """
+    if directories is not None:
+        directories.append(article_dir)
+    index_file = article_dir / "index.html"
+    head = read_page_head(index_file)
+    if head is not None:
+        # 源文件已删除的预渲染页面不是文章
+        if head != _GENERATED_POST_MARKER_BYTES:
+            yield ('html', index_file, slug, path)
+        return
+    with os.scandir(article_dir) as entries:
+        sub_dirs = [entry.name for entry in entries
+                    if not is_ignored(entry.name) and entry.is_dir(follow_symlinks=False)]
+    for name in sub_dirs:
+        sub_dir = article_dir / name
+        yield from iter_article_dir(sub_dir, slug, f"./{sub_dir.as_posix()}/", directories)
+
+def discover_sources(post_dir, directories=None):
+    """发现 post 目录下的所有文章源文件，返回列表（参见 iter_sources）"""
+    return list(iter_sources(post_dir, directories))
+
+def parse_source(source):
+    """解析单个源文件，返回文章信息"""
+    kind, file_path, slug, path = source
+    if kind == 'markdown':
+        return extract_markdown_info(file_path)
+    
+    article_info = extract_article_info(file_path, slug)
+    if article_info and path:
+        # 更新路径为正确的嵌套路径
+        article_info['path'] = path
+    return article_info
+
+def timed_parse_source(source):
+    """解析单个源文件，同时返回解析耗时（秒）和读取的字节数"""
+    bytes_before = get_write_stats()['bytes_read']
+    started = time.perf_counter()
+    article_info = parse_source(source)
+    seconds = time.perf_counter() - started
+    return article_info, seconds, get_write_stats()['bytes_read'] - bytes_before
+
+def parse_sources(sources, jobs=1, timings=None, executor=None):
+    """解析多个源文件，结果顺序与输入一致
+
+    jobs 大于 1 且待解析文件足够多时，使用进程池并行解析（工作进程读取的字节数计入本进程）；
+    传入 executor 时使用这个进程池，不再每次新建。
+    传入 timings 列表时，按相同顺序在其中记录每个文件的解析耗时
+    """
+    if jobs > 1 and len(sources) >= PARALLEL_MIN_SOURCES:
+        chunksize = max(1, len(sources) // (jobs * 4))
+        if executor is not None:
+            results = list(executor.map(timed_parse_source, sources, chunksize=chunksize))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(timed_parse_source, sources, chunksize=chunksize))
+        record_read(sum(bytes_read for _, _, bytes_read in results))
+    elif timings is not None:
+        results = [timed_parse_source(source) for source in sources]
+    else:
+        return [parse_source(source) for source in sources]
+    
+    if timings is not None:
+        timings.extend(seconds for _, seconds, _ in results)
+    return [article_info for article_info, _, _ in results]
+
+def refresh_sources(sources, keys, cached_sources, changes, jobs=1, executor=None):
+    """检查一批源文件，返回 {源文件: 清单条目}
+
+    大小和修改时间未变（或 HTML 文章的内容哈希未变）的源文件沿用 cached_sources 中的条目，
+    其余的重新解析（可并行），并在 changes 的 added / modified 中记录
+    """
+    new_sources = {}
+    
+    # 第一遍：根据清单判断哪些文件需要重新解析
+    pending = []
+    for source, key in zip(sources, keys):
+        file_path = source[1]
+        stat = os.stat(key)
+        entry = cached_sources.get(key)
+        new_entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            new_entry['hash'] = entry['hash']
+            new_entry['info'] = entry['info']
+        elif source[0] == 'markdown':
+            # Markdown 只需读取 front matter，重新解析比计算整个文件的哈希更省
+            new_entry['hash'] = None
+            pending.append(source)
+            changes['modified' if entry else 'added'].append(key)
+        else:
+            data = file_path.read_bytes()
+            record_read(len(data))
+            new_entry['hash'] = hashlib.sha256(data).hexdigest()
+            if entry and entry['hash'] == new_entry['hash']:
+                # 只是修改时间变了，内容没变
+                new_entry['info'] = entry['info']
+            else:
+                pending.append(source)
+                changes['modified' if entry else 'added'].append(key)
+        new_sources[key] = new_entry
+    
+    # 第二遍：解析新增/修改的文件（可并行）
+    timings = [] if profiling_enabled() else None
+    for source, article_info in zip(pending, parse_sources(pending, jobs, timings, executor)):
+        # 常驻内存的文章信息使用紧凑的 Article 记录
+        new_sources[str(source[1])]['info'] = compact_article(article_info)
+    if timings is not None:
+        for source, seconds in zip(pending, timings):
+            key = str(source[1])
+            record_parse_time(key, seconds, new_sources[key]['size'])
+    return new_sources
+
+def scan_articles(manifest=None, changes=None, jobs=1, verbose=True, directories=None, sources=None):
+    """扫描所有文章
+
+    传入构建清单时，大小和修改时间未变（或 HTML 文章的内容哈希未变）的源文件直接复用
+    清单中的文章信息，只重新解析新增/修改的文件；清单会被原地更新。
+    Markdown 文章只读取 front matter（和没有 excerpt 时正文的开头），不计算内容哈希。
+    传入 changes 字典时，会在其中记录 added / modified / deleted 的源文件。
+    jobs 大于 1 时并行解析，合并结果的顺序与串行扫描完全一致。
+    verbose 为 False 时不逐篇输出发现的文章；directories 参见 discover_sources；
+    传入已发现的源文件列表 sources 时不再遍历 post 目录。
+    """
     articles = []
     post_dir = Path("post")
     
@@ -67,36 +294,32 @@ def scan_articles():
         print("❌ post 目录不存在")
         return articles
     
-    # 扫描 Markdown 文件
-    markdown_files = list(post_dir.glob("*.md")) + list(post_dir.glob("*.markdown"))
-    for md_file in markdown_files:
-        article_info = extract_markdown_info(md_file)
+    cached_sources = manifest['sources'] if manifest is not None else {}
+    if changes is None:
+        changes = {}
+    for key in ('added', 'modified', 'deleted'):
+        changes.setdefault(key, [])
+    
+    if sources is None:
+        sources = discover_sources(post_dir, directories)
+    keys = [str(source[1]) for source in sources]
+    new_sources = refresh_sources(sources, keys, cached_sources, changes, jobs)
+    
+    # 按发现顺序合并结果，保证与串行扫描一致
+    for (kind, file_path, slug, path), key in zip(sources, keys):
+        article_info = new_sources[key]['info']
         if article_info:
             articles.append(article_info)
-            print(f"📄 发现 Markdown 文章: {md_file.name}")
-    
-    # 扫描 HTML 文件（兼容旧格式）
-    for article_dir in post_dir.iterdir():
-        if article_dir.is_dir():
-            # 检查直接包含 index.html 的情况
-            index_file = article_dir / "index.html"
-            if index_file.exists():
-                article_info = extract_article_info(index_file, article_dir.name)
-                if article_info:
-                    articles.append(article_info)
-            else:
-                # 检查嵌套目录的情况
-                for sub_dir in article_dir.iterdir():
-                    if sub_dir.is_dir():
-                        nested_index = sub_dir / "index.html"
-                        if nested_index.exists():
-                            # 使用父目录名作为文章名
-                            article_info = extract_article_info(nested_index, article_dir.name)
-                            if article_info:
-                                # 更新路径为正确的嵌套路径
-                                article_info['path'] = f"./post/{article_dir.name}/{sub_dir.name}/"
-                                articles.append(article_info)
-                                print(f"📁 发现嵌套文章: {article_dir.name}/{sub_dir.name}")
+            if not verbose:
+                continue
+            if kind == 'markdown':
+                print(f"📄 发现 Markdown 文章: {file_path.name}")
+            elif path:
+                print(f"📁 发现嵌套文章: {path[len('./post/'):-1]}")
+    
+    changes['deleted'].extend(sorted(set(cached_sources) - set(new_sources)))
+    if manifest is not None:
+        manifest['sources'] = new_sources
     
     # 按日期排序（最新的在前），相同日期按文件名排序
     articles.sort(key=lambda x: (x['date'], x['slug']), reverse=True)
@@ -106,10 +329,11 @@ def extract_markdown_info(md_file):
     """从 Markdown 文件中提取文章信息"""
     try:
         with open(md_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 解析 YAML front matter
-        front_matter = parse_front_matter(content)
+            # 只读到 front matter 结束为止；没有 excerpt 时再读正文开头用于提取摘要
+            front_matter, body = read_front_matter(f)
+            if front_matter and not front_matter.get('excerpt'):
+                body += f.read(EXCERPT_PREFIX_CHARS)
+            record_read(f.buffer.raw.tell())
         
         if not front_matter:
             print(f"⚠️  {md_file.name} 没有找到 front matter，跳过")
@@ -139,9 +363,8 @@ def extract_markdown_info(md_file):
         # 提取摘要
         excerpt = front_matter.get('excerpt', '')
         if not excerpt:
-            # 从内容中提取第一段作为摘要
-            content_without_frontmatter = content.split('---', 2)[-1] if '---' in content else content
-            first_paragraph = re.search(r'^# .+\n\n(.+?)(?:\n\n|\n#)', content_without_frontmatter, re.DOTALL)
+            # 从正文开头提取第一段作为摘要
+            first_paragraph = re.search(r'^# .+\n\n(.+?)(?:\n\n|\n#)', body, re.DOTALL)
             if first_paragraph:
                 excerpt = clean_html_tags(first_paragraph.group(1))[:200]
             else:
@@ -162,68 +385,24 @@ def extract_markdown_info(md_file):
         print(f"❌ 解析 Markdown 文件 {md_file.name} 失败: {e}")
         return None
 
-def parse_front_matter(content):
-    """解析 YAML front matter"""
-    if not content.startswith('---'):
-        return None
-    
-    try:
-        # 找到 front matter 的结束位置
-        end_marker = content.find('---', 3)
-        if end_marker == -1:
-            return None
-        
-        front_matter_text = content[3:end_marker].strip()
-        
-        # 简单的 YAML 解析（处理基本格式）
-        front_matter = {}
-        for line in front_matter_text.split('\n'):
-            line = line.strip()
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip()
-                value = value.strip()
-                
-                # 处理数组格式
-                if value.startswith('[') and value.endswith(']'):
-                    # 移除方括号并分割
-                    array_content = value[1:-1]
-                    if array_content.strip():
-                        front_matter[key] = [item.strip() for item in array_content.split(',')]
-                    else:
-                        front_matter[key] = []
-                else:
-                    # 移除引号
-                    if (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
-                        value = value[1:-1]
-                    front_matter[key] = value
-        
-        return front_matter
-    except Exception as e:
-        print(f"⚠️  解析 front matter 失败: {e}")
-        return None
-
 def extract_article_info(html_file, article_slug):
-    """从HTML文件中提取文章信息"""
+    """从HTML文件中提取文章信息（增量解析，标题、日期、摘要和标签齐全后停止读取）"""
     try:
         with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+            meta = read_post_meta(f)
+            record_read(f.buffer.raw.tell())
         
         # 提取标题
-        title_match = re.search(r'<h2 class="post-title">(.+?)</h2>', content)
-        title = title_match.group(1) if title_match else article_slug
+        title = meta.title if meta.title is not None else article_slug
         
         # 提取日期
-        date_match = re.search(r'<div class="post-date">(.+?)</div>', content)
-        date = date_match.group(1) if date_match else datetime.datetime.now().strftime('%Y-%m-%d')
+        date = meta.date if meta.date is not None else datetime.datetime.now().strftime('%Y-%m-%d')
         
         # 提取摘要 - 优先从文章内容中提取第一段
-        abstract = extract_abstract_from_content(content)
+        abstract = abstract_from_meta(meta)
         
         # 提取标签
-        tags = []
-        tag_matches = re.findall(r'<span class="tag">(.+?)</span>', content)
-        tags = [tag.strip() for tag in tag_matches]
+        tags = meta.tags
         
         return {
             'slug': article_slug,
@@ -237,235 +416,498 @@ def extract_article_info(html_file, article_slug):
         print(f"❌ 解析文章 {article_slug} 失败: {e}")
         return None
 
-def update_homepage(articles):
-    """更新首页"""
+# Markdown 文章预渲染页面的第一行（后接源文件路径），用来区分手写的 HTML 文章页面：手写页面不会被覆盖或删除
+GENERATED_POST_MARKER = "<!-- generated-from: "
+_GENERATED_POST_MARKER_BYTES = GENERATED_POST_MARKER.encode('utf-8')
+
+def is_markdown_source(path):
+    return Path(path).suffix in ('.md', '.markdown')
+
+def post_page_file(md_file):
+    """Markdown 文章预渲染页面的路径 post/<文件名>/index.html（即文章的链接地址）"""
+    md_file = Path(md_file)
+    return md_file.parent / md_file.stem / "index.html"
+
+def read_page_head(page):
+    """读取页面开头与预渲染标记等长的字节；页面不存在（或无法读取）时返回 None"""
+    try:
+        with open(page, 'rb') as f:
+            return f.read(len(_GENERATED_POST_MARKER_BYTES))
+    except OSError:
+        return None
+
+def is_generated_post_page(page):
+    """页面是否由 Markdown 文章预渲染生成（只读开头几个字节；不存在时返回 False）"""
+    return read_page_head(page) == _GENERATED_POST_MARKER_BYTES
+
+def write_post_page(md_file, article):
+    """把一篇 Markdown 文章预渲染为静态页面（页面任务），返回源文件的内容哈希（用于 posts.json）
+
+    Markdown 转换结果来自渲染缓存
+    """
+    with open(md_file, 'rb') as f:
+        data = f.read()
+    record_read(len(data))
+    digest = hashlib.sha256(data).hexdigest()
+    page = post_page_file(md_file)
+    if page.exists() and not is_generated_post_page(page):
+        print(f"⚠️  {page} 是手写的页面，跳过 {md_file} 的预渲染")
+        return digest
+    with io.TextIOWrapper(io.BytesIO(data), encoding='utf-8') as f:
+        _, rest = read_front_matter(f)
+        body = rest + f.read()
+    # 正文中的相对链接相对于 post 目录，页面在下一层目录中
+    content = rebase_links(markdown_to_html(body), 1)
+    html = render_article_page(article['title'], article['date'], content, article['tags'], article['abstract'])
+    write_text(page, f"{GENERATED_POST_MARKER}{Path(md_file).as_posix()} -->\n{html}")
+    return digest
+
+def remove_post_page(md_file):
+    """删除已删除的 Markdown 文章的预渲染页面（手写页面保留）"""
+    page = post_page_file(md_file)
+    if is_generated_post_page(page):
+        page.unlink()
+        try:
+            page.parent.rmdir()
+        except OSError:
+            pass
+
+def update_post_pages(manifest, changes=None, pool=None):
+    """预渲染 Markdown 文章为 post/<文件名>/index.html，访问者不需要在浏览器中解析 Markdown
+
+    只渲染新增、修改的文章、页面还不存在和还没有内容哈希的文章（changes 为 None 时渲染全部），
+    删除的文章对应的预渲染页面一并删除。渲染时顺便计算的内容哈希写回 manifest 的条目（替换为新的字典，
+    元数据库据此发现变化）。返回渲染的文章数
+    """
+    changed = None
+    if changes is not None:
+        changed = set(changes.get('added', ())) | set(changes.get('modified', ()))
+        for key in changes.get('deleted', ()):
+            if is_markdown_source(key):
+                remove_post_page(key)
+    
+    tasks = []
+    for key, entry in manifest['sources'].items():
+        info = entry['info']
+        if info is None or info.get('type') != 'markdown':
+            continue
+        if (changed is None or key in changed or entry['hash'] is None
+                or not post_page_file(key).exists()):
+            tasks.append((write_post_page, (key, info)))
+    if tasks:
+        print(f"📄 预渲染 {len(tasks)} 篇 Markdown 文章...")
+    sources = manifest['sources']
+    for (_, (key, _)), digest in zip(tasks, run_page_tasks(tasks, pool)):
+        sources[key] = dict(sources[key], hash=digest)
+    return len(tasks)
+
+def paginate(items, page_size):
+    """按固定大小分页，至少返回一页"""
+    return [items[i:i + page_size] for i in range(0, len(items), page_size)] or [[]]
+
+def rebase_links(html, depth):
+    """把页面中的相对链接（./a、../a 和 images/a.png 这样的裸路径）调整为从更深 depth 层目录访问时的路径
+
+    带协议（https:、mailto: 等）、以 /、#、? 开头的链接和空链接不变；开头的 ./ 去掉
+    """
+    prefix = '../' * depth
+    return re.sub(r'((?:href|src)=")(\./|(?![A-Za-z][A-Za-z0-9+.-]*:|[/#?"]))',
+                  lambda m: m.group(1) + prefix, html)
+
+def pagination_html(page_number, page_count):
+    """生成上一页/下一页链接（路径相对于第 1 页所在目录）"""
+    links = []
+    if page_number > 1:
+        prev_href = './' if page_number == 2 else f'./page/{page_number - 1}/'
+        links.append(f'<a class="prev-page" href="{prev_href}">上一页</a>')
+    if page_number < page_count:
+        links.append(f'<a class="next-page" href="./page/{page_number + 1}/">下一页</a>')
+    return '\n'.join(links)
+
+def changed_pages(pages, previous, page_size):
+    """与上一次的文章列表比较，返回内容有变化的页码集合
+
+    previous 为 None 或总页数变化（分页链接全部改变）时返回所有页码
+    """
+    if previous is not None:
+        old_pages = paginate(previous, page_size)
+        if len(old_pages) == len(pages):
+            return {number for number, (new, old) in enumerate(zip(pages, old_pages), 1) if new != old}
+    return set(range(1, len(pages) + 1))
+
+def write_page(base_dir, number, page_html):
+    """写入一个分页：第 1 页为 base_dir/index.html，其余为 base_dir/page/N/index.html（页面中的链接相对于第 1 页）"""
+    base_dir = Path(base_dir)
+    if number == 1:
+        write_text(base_dir / 'index.html', page_html)
+    else:
+        write_text(base_dir / 'page' / str(number) / 'index.html', rebase_links(page_html, 2))
+
+def remove_stale_pages(base_dir, page_count):
+    """删除页码超过 page_count 的旧分页目录（文章减少后多出来的分页）"""
+    page_dir = Path(base_dir) / 'page'
+    if page_dir.is_dir():
+        for child in page_dir.iterdir():
+            if child.is_dir() and child.name.isdigit() and int(child.name) > page_count:
+                shutil.rmtree(child)
+        if not any(page_dir.iterdir()):
+            page_dir.rmdir()
+
+# 模板页面及其中的生成区域（按在页面中出现的顺序），区域用 <!-- generated:名称 --> 标记（见 page_regions.py）
+PAGE_REGIONS = {
+    'index.html': ('posts',),
+    'archives/index.html': ('archives',),
+    'tags/index.html': ('tags',),
+}
+
+def check_templates():
+    """检查所有模板页面的生成区域标记，缺少时在写入任何页面之前抛出 MissingRegionError"""
+    for path, names in PAGE_REGIONS.items():
+        split_regions(read_text(path), names, path)
+
+# {模板路径: ((大小, 修改时间), 编译好的模板)}，每个进程中模板文件未变化时只编译一次
+_templates = {}
+
+def load_template(path):
+    """读取模板页面，编译为以生成区域为占位的模板（文件未变化时直接使用上次的结果）"""
+    stat = os.stat(path)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = _templates.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    template = compile_regions(read_text(path), PAGE_REGIONS[path], path)
+    _templates[path] = (key, template)
+    return template
+
+def load_homepage_template():
+    """读取首页模板（文章列表区域 posts）"""
+    return load_template('index.html')
+
+def render_homepage_page(template, page_articles, number, page_count):
+    """生成首页的第 number 页"""
+    # 生成文章列表HTML（清理摘要中的HTML实体）
+    articles_html = ''.join([
+        POST_ITEM.render(href=article['path'], title=article['title'], date=article['date'],
+                         abstract=article['abstract'].replace('&quot;', '"').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>'))
+        for article in page_articles])
+    
+    # 替换文章列表和分页部分
+    links = pagination_html(number, page_count)
+    return template.render(posts=f'{articles_html}<div class="pagination-container">\n{links}\n</div>\n')
+
+def write_homepage_page(page_articles, number, page_count):
+    """生成并写入首页的第 number 页（页面任务，可以在工作进程中执行）"""
+    write_page('.', number, render_homepage_page(load_homepage_template(), page_articles, number, page_count))
+
+def update_homepage(articles, previous=None, pool=None):
+    """更新首页（每页 HOMEPAGE_PAGE_SIZE 篇，其余分页写入 page/N/）
+
+    传入上一次的文章列表 previous 时，只重新生成内容有变化的分页；
+    传入 PagePool 时各分页并行生成
+    """
     print("📝 更新首页...")
     
-    # 生成文章列表HTML
-    articles_html = ""
-    for article in articles[:5]:  # 只显示最新5篇
-        # 清理摘要中的HTML实体
-        clean_abstract = article['abstract'].replace('&quot;', '"').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
-        articles_html += f"""
-            <article class="post-item">
-              <div class="left">
-                <a href="{article['path']}">
-                  <h2 class="post-title">{article['title']}</h2>
-                </a>
-                <div class="post-date">
-                  {article['date']}
-                </div>
-                <div class="post-abstract">
-                  <p>{clean_abstract}</p>
-                </div>
-              </div>
-            </article>
-        """
-    
-    # 读取并更新首页
-    with open('index.html', 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 替换文章列表部分
-    pattern = r'<div class="content-container" data-aos="fade-up">(.*?)<div class="pagination-container">'
-    replacement = f'<div class="content-container" data-aos="fade-up">{articles_html}<div class="pagination-container">'
-    
-    new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-    
-    with open('index.html', 'w', encoding='utf-8') as f:
-        f.write(new_content)
-    
-    print("✅ 首页更新完成")
-
-def update_archives(articles):
-    """更新归档页面"""
-    print("📚 更新归档页面...")
+    pages = paginate(articles, HOMEPAGE_PAGE_SIZE)
+    numbers = changed_pages(pages, previous, HOMEPAGE_PAGE_SIZE)
+    run_page_tasks([(write_homepage_page, (page_articles, number, len(pages)))
+                    for number, page_articles in enumerate(pages, 1) if number in numbers], pool)
+    remove_stale_pages('.', len(pages))
     
-    # 按年份分组
-    articles_by_year = defaultdict(list)
-    for article in articles:
+    print(f"✅ 首页更新完成（共 {len(pages)} 页，生成 {len(numbers)} 页）")
+
+def load_archives_template():
+    """读取归档页面模板（归档区域 archives）"""
+    return load_template('archives/index.html')
+
+def render_archives_page(template, page_articles, number, page_count):
+    """生成归档页面的第 number 页"""
+    # 生成归档HTML，按年份分组（文章已按日期排序，每页开头重复当前年份）
+    parts = []
+    current_year = None
+    for article in page_articles:
         year = article['date'][:4]
-        articles_by_year[year].append(article)
-    
-    # 生成归档HTML
-    archives_html = ""
-    for year in sorted(articles_by_year.keys(), reverse=True):
-        archives_html += f'<h2 class="year" data-aos="fade-in" data-aos-delay="500">{year}</h2>\n'
-        for article in articles_by_year[year]:
-            archives_html += f"""
-                <article class="post">
-                  <a href="../{article['path']}">
-                    <h2 class="post-title">{article['title']}</h2>
-                  </a>
-                </article>
-            """
-    
-    # 读取并更新归档页面
-    with open('archives/index.html', 'r', encoding='utf-8') as f:
-        content = f.read()
+        if year != current_year:
+            parts.append(ARCHIVE_YEAR.render(year=year))
+            current_year = year
+        parts.append(ARCHIVE_ITEM.render(path=article['path'], title=article['title']))
     
-    # 替换归档内容
-    pattern = r'<div class="archives-container">(.*?)</div>'
-    replacement = f'<div class="archives-container">{archives_html}</div>'
+    links = pagination_html(number, page_count)
+    if links:
+        parts.append(f'<nav class="pagination-container">\n{links}\n</nav>\n')
+    archives_html = ''.join(parts)
     
-    new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+    # 替换归档内容
+    return template.render(archives=f'\n<div class="archives-container">{archives_html}</div>\n')
+
+def write_archives_page(page_articles, number, page_count):
+    """生成并写入归档页面的第 number 页（页面任务）"""
+    write_page('archives', number, render_archives_page(load_archives_template(), page_articles, number, page_count))
+
+def update_archives(articles, previous=None, pool=None):
+    """更新归档页面（每页 ARCHIVE_PAGE_SIZE 篇，其余分页写入 archives/page/N/）
+
+    传入上一次的文章列表 previous 时，只重新生成内容有变化的分页；
+    传入 PagePool 时各分页并行生成
+    """
+    print("📚 更新归档页面...")
     
-    with open('archives/index.html', 'w', encoding='utf-8') as f:
-        f.write(new_content)
+    pages = paginate(articles, ARCHIVE_PAGE_SIZE)
+    numbers = changed_pages(pages, previous, ARCHIVE_PAGE_SIZE)
+    run_page_tasks([(write_archives_page, (page_articles, number, len(pages)))
+                    for number, page_articles in enumerate(pages, 1) if number in numbers], pool)
+    remove_stale_pages('archives', len(pages))
     
-    print("✅ 归档页面更新完成")
+    print(f"✅ 归档页面更新完成（共 {len(pages)} 页，生成 {len(numbers)} 页）")
+
+def tag_member(article):
+    """文章在标签页面上显示的信息"""
+    return (article['path'], article['title'], article['date'], article['abstract'])
+
+def tag_fingerprint(tag_articles):
+    """标签页面内容指纹：成员及其在页面上显示的信息"""
+    members = [tag_member(a) for a in tag_articles]
+    return hashlib.sha256(json.dumps(members, ensure_ascii=False).encode('utf-8')).hexdigest()
 
-def update_tags(articles):
-    """更新标签页面"""
+def tag_slug(tag):
+    """标签的 URL 目录名"""
+    return re.sub(r'[^\w\s-]', '', tag).replace(' ', '-')
+
+def update_tags(store, manifest=None, only=None, index=None, pool=None):
+    """更新标签页面（标签及其文章从文章元数据库按索引查询）
+
+    传入构建清单时，只重新生成成员或成员信息有变化的标签详情页；
+    再传入标签集合 only 时，只检查这些标签，其余标签沿用清单中的指纹。
+    传入内存中文章列表的倒排索引 index 时，从索引中取各标签的文章，不再查询数据库；
+    传入 PagePool 时各标签详情页并行生成
+    """
     print("🏷️ 更新标签页面...")
     
-    # 收集所有标签
-    all_tags = set()
-    for article in articles:
-        all_tags.update(article['tags'])
+    if index is not None:
+        tag_counts = index.tag_counts()
+        tag_articles_of = lambda tag: index.select([tag])
+    else:
+        tag_counts = store.tag_counts()
+        tag_articles_of = store.by_tag
+    write_tags_index(tag_counts)
+    
+    # 为成员有变化的标签重新生成详情页面
+    previous = manifest.get('tags', {}) if manifest is not None else {}
+    fingerprints = {}
+    tasks = []
+    for tag in sorted(tag_counts):
+        if only is not None and tag not in only and tag in previous:
+            fingerprints[tag] = previous[tag]
+            continue
+        tag_articles = tag_articles_of(tag)
+        fingerprints[tag] = tag_fingerprint(tag_articles)
+        page = Path("tag") / tag_slug(tag) / "index.html"
+        if previous.get(tag) != fingerprints[tag] or not page.exists():
+            tasks.append((create_tag_page, (tag, tag_articles)))
+    run_page_tasks(tasks, pool)
+    # 上次构建有、这次已经没有文章的标签，删除它们的详情页
+    removed = remove_vanished_tag_pages(previous, tag_counts)
     
+    if manifest is not None:
+        manifest['tags'] = fingerprints
+    
+    print(f"✅ 标签页面更新完成（重新生成 {len(tasks)}/{len(tag_counts)} 个标签页"
+          f"{f'，删除 {removed} 个' if removed else ''}）")
+
+def write_tags_index(tags):
+    """更新标签列表页面 tags/index.html"""
     # 生成标签列表HTML
-    tags_html = ""
-    for tag in sorted(all_tags):
-        tag_slug = re.sub(r'[^\w\s-]', '', tag).replace(' ', '-')
-        tags_html += f'<a class="tag" href="../tag/{tag_slug}/">{tag}</a>\n'
+    tags_html = ''.join([TAG_LINK.render(slug=tag_slug(tag), tag=tag) for tag in sorted(tags)])
     
     # 更新标签列表页面
-    with open('tags/index.html', 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    pattern = r'<div class="tags-container">(.*?)</div>'
-    replacement = f'<div class="tags-container">{tags_html}</div>'
-    
-    new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-    
-    with open('tags/index.html', 'w', encoding='utf-8') as f:
-        f.write(new_content)
-    
-    # 为每个标签创建详情页面
-    for tag in all_tags:
-        create_tag_page(tag, articles)
-    
-    print("✅ 标签页面更新完成")
-
-def create_tag_page(tag, articles):
-    """创建标签详情页面"""
-    tag_slug = re.sub(r'[^\w\s-]', '', tag).replace(' ', '-')
-    tag_dir = Path(f"tag/{tag_slug}")
-    tag_dir.mkdir(parents=True, exist_ok=True)
-    
-    # 找到该标签下的文章
-    tag_articles = [a for a in articles if tag in a['tags']]
-    
-    # 生成标签页面HTML
-    articles_html = ""
-    for article in tag_articles:
-        articles_html += f"""
-            <article class="post-item">
-              <div class="left">
-                <a href="../../{article['path']}">
-                  <h2 class="post-title">{article['title']}</h2>
-                </a>
-                <div class="post-date">
-                  {article['date']}
-                </div>
-                <div class="post-abstract">
-                  <p>{article['abstract']}</p>
-                </div>
-              </div>
-            </article>
-        """
-    
-    tag_html = f"""<!DOCTYPE html>
-<html>
-  <head>
-    <meta charset="utf-8">
-    <title>{tag} | Gridea</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1, maximum-scale=1, user-scalable=no">
-    <link rel="stylesheet" href="../../styles/main.css">
-  </head>
-  <body>
-    <div class="main">
-      <div class="sidebar">
-        <div class="top-container">
-          <div class="top-header-container">
-            <a class="site-title-container" href="/">
-              <img src="../../images/avatar.png?v=1659011765580" class="site-logo">
-              <h1 class="site-title">Gridea</h1>
-            </a>
-          </div>
-          <div>
-            <a href="/" class="site-nav">首页</a>
-            <a href="/archives" class="site-nav">归档</a>
-            <a href="/tags" class="site-nav">标签</a>
-            <a href="/post/about" class="site-nav">关于</a>
-          </div>
-        </div>
-      </div>
-      
-      <div class="main-container">
-        <div class="content-container">
-          <h2 class="current-tag">标签: {tag}</h2>
-          {articles_html}
-        </div>
-      </div>
-    </div>
-  </body>
-</html>"""
-    
-    with open(tag_dir / "index.html", 'w', encoding='utf-8') as f:
-        f.write(tag_html)
-
-def update_rss(articles):
+    new_content = load_template('tags/index.html').render(tags=f'\n<div class="tags-container">\n{tags_html}</div>\n')
+    
+    write_text('tags/index.html', new_content)
+
+def create_tag_page(tag, tag_articles):
+    """创建标签详情页面
+
+    tag_articles 为该标签下的文章（已排序，可以是生成器），页面分段写入
+    """
+    tag_dir = Path(f"tag/{tag_slug(tag)}")
+    write_chunks(tag_dir / "index.html", tag_page_chunks(tag, tag_articles))
+
+def remove_vanished_tag_pages(previous, tags):
+    """删除 previous（上次构建的标签）中已经不在 tags 里的标签的详情页面，返回删除的标签数
+
+    目录名与现有标签相同的（如 "C++" 与 "C"）保留
+    """
+    slugs = {tag_slug(tag) for tag in tags}
+    vanished = [tag for tag in previous if tag not in tags and tag_slug(tag) not in slugs]
+    for tag in vanished:
+        tag_dir = Path("tag") / tag_slug(tag)
+        (tag_dir / "index.html").unlink(missing_ok=True)
+        try:
+            tag_dir.rmdir()
+        except OSError:
+            pass
+    return len(vanished)
+
+def tag_page_chunks(tag, tag_articles):
+    """逐段生成标签详情页面的 HTML（文章条目按需生成）"""
+    items = (POST_ITEM.render(href=f"../../{article['path']}", title=article['title'],
+                              date=article['date'], abstract=article['abstract'])
+             for article in tag_articles)
+    return SIMPLE_PAGE.chunks(title=tag, logo=SITE_LOGO,
+                              content=itertools.chain((TAG_HEADING.render(tag=tag),), items))
+
+def update_rss(store):
     """更新RSS文件"""
     print("📡 更新RSS文件...")
     
-    # 生成RSS条目
-    entries = ""
-    for article in articles[:10]:  # 只包含最新10篇
-        entries += f"""
-    <entry>
-        <title type="html"><![CDATA[{article['title']}]]></title>
-        <id>./{article['path']}</id>
-        <link href="./{article['path']}">
-        </link>
-        <updated>{article['date']}T12:00:00.000Z</updated>
-        <summary type="html"><![CDATA[<p>{article['abstract']}</p>]]></summary>
-    </entry>"""
-    
-    # 生成完整RSS内容
-    rss_content = f"""<?xml version="1.0" encoding="utf-8"?>
-<feed xmlns="http://www.w3.org/2005/Atom">
-    <id>.</id>
-    <title>Gridea</title>
-    <updated>{datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S.000Z')}</updated>
-    <generator>https://github.com/jpmonette/feed</generator>
-    <link rel="alternate" href="."/>
-    <link rel="self" href="./atom.xml"/>
-    <subtitle>温故而知新</subtitle>
-    <logo>./images/avatar.png</logo>
-    <icon>./favicon.ico</icon>
-    <rights>All rights reserved {datetime.datetime.now().year}, Gridea</rights>{entries}
-</feed>"""
-    
-    with open('atom.xml', 'w', encoding='utf-8') as f:
-        f.write(rss_content)
+    # 只包含最新 RSS_SIZE 篇（按日期索引查询）
+    write_text('atom.xml', render_rss(store.latest(RSS_SIZE)))
     
     print("✅ RSS文件更新完成")
 
-def main():
-    """主函数"""
-    print("🚀 开始更新博客...")
-    print("=" * 50)
+def render_rss(articles):
+    """生成 RSS 内容，articles 为最新的几篇文章"""
+    # 生成RSS条目
+    entries = [RSS_ENTRY.render(title=article['title'], path=article['path'],
+                                date=article['date'], abstract=article['abstract'])
+               for article in articles]
     
-    # 扫描文章
-    articles = scan_articles()
-    if not articles:
-        print("❌ 没有找到任何文章")
-        return
+    # 订阅源的更新时间取最新文章的日期，文章没有变化时输出保持不变
+    feed_updated = f"{articles[0]['date']}T12:00:00.000Z" if articles else datetime.datetime.now().strftime('%Y-%m-%dT%H:%M:%S.000Z')
     
-    print(f"📖 找到 {len(articles)} 篇文章")
+    # 生成完整RSS内容
+    return RSS_FEED.render(updated=feed_updated, year=str(datetime.datetime.now().year), entries=entries)
+
+def update_site(articles, manifest, jobs=1, changes=None):
+    """预渲染 Markdown 文章，更新首页、归档、标签、RSS、文章清单和搜索索引（jobs 大于 1 时各页面由多个进程并行生成）
+
+    changes 为本次扫描的变化（见 scan_articles），只预渲染有变化的文章；为 None 时全部重新渲染
+    """
+    check_templates()
+    store = get_article_store()
+    with PagePool(jobs) as pool:
+        with profile_phase('update_post_pages'):
+            update_post_pages(manifest, changes, pool)
+        # 把扫描结果（和预渲染时算出的内容哈希）写入元数据库（页面全部生成后才提交），标签页和 RSS 从数据库查询
+        store.write_manifest(manifest)
+        with profile_phase('update_homepage'):
+            update_homepage(articles, pool=pool)
+        with profile_phase('update_archives'):
+            update_archives(articles, pool=pool)
+        with profile_phase('update_tags'):
+            update_tags(store, manifest, index=ArticleIndex(articles), pool=pool)
+    with profile_phase('update_rss'):
+        update_rss(store)
+    with profile_phase('update_posts_manifest'):
+        write_posts_manifest(articles, manifest['sources'])
+    with profile_phase('update_search_index'):
+        update_search_index(articles)
+
+def changed_tags(old_sources, new_sources, changes):
+    """新增、修改、删除的源文件在变化前后涉及的所有标签"""
+    tags = set()
+    for key in changes['added'] + changes['modified'] + changes['deleted']:
+        for entries in (old_sources, new_sources):
+            info = entries.get(key, {}).get('info')
+            if info:
+                tags.update(info['tags'])
+    return tags
+
+def snapshot_sources(paths):
+    """记录各路径的 (大小, 修改时间)，路径不存在时记为 None"""
+    snapshot = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            snapshot[path] = None
+    return snapshot
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """不输出访问日志的静态文件处理器"""
+    
+    def log_message(self, format, *args):
+        pass
+
+def serve_preview(port):
+    """在后台线程中启动本地静态文件服务器，用于预览生成的页面"""
+    handler = functools.partial(QuietHandler, directory=os.getcwd())
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🌐 本地预览: http://127.0.0.1:{port}/")
+    return server
+
+def watch_site(manifest, articles, jobs=1, interval=WATCH_INTERVAL):
+    """监视 post 目录，文章变化时只重新生成受影响的页面
+
+    文章列表和构建清单常驻内存；每次轮询只 stat 已知的源文件和文章目录
+    （目录的修改时间可以发现新增/删除的文件），不依赖 inotify 等平台接口。
+    """
+    post_dir = Path("post")
+    directories = []
+    sources = discover_sources(post_dir, directories)
+    targets = [str(post_dir)] + [str(d) for d in directories] + list(manifest['sources'])
+    snapshot = snapshot_sources(targets)
     
+    print(f"\n👀 正在监视 post 目录（每 {interval} 秒检查一次，按 Ctrl+C 退出）...")
+    pool = PagePool(jobs)
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot_sources(targets)
+            if current == snapshot:
+                continue
+            
+            started = time.perf_counter()
+            reset_write_stats()
+            
+            # 只有已知源文件被原地修改时沿用上次的文件列表，目录有变化时重新遍历
+            changed = [path for path in targets if current[path] != snapshot[path]]
+            if any(path not in manifest['sources'] or current[path] is None for path in changed):
+                directories = []
+                sources = discover_sources(post_dir, directories)
+            
+            changes = {}
+            old_sources = dict(manifest['sources'])
+            new_articles = scan_articles(manifest, changes, jobs=jobs, verbose=False, sources=sources)
+            targets = [str(post_dir)] + [str(d) for d in directories] + list(manifest['sources'])
+            snapshot = current if set(targets) == set(current) else snapshot_sources(targets)
+            if not any(changes.values()):
+                continue
+            
+            print(f"\n🔄 新增 {len(changes['added'])} 篇，修改 {len(changes['modified'])} 篇，删除 {len(changes['deleted'])} 篇")
+            # 正文的修改只影响文章自己的预渲染页面（和 posts.json 中的内容哈希）
+            update_post_pages(manifest, changes, pool)
+            write_posts_manifest(new_articles, manifest['sources'])
+            if not new_articles or new_articles == articles:
+                print("❌ 没有找到任何文章" if not new_articles else "✨ 文章列表信息没有变化，无需更新列表页面")
+                save_manifest(manifest)
+                articles = new_articles
+                continue
+            
+            # 只重新生成内容有变化的分页和标签页，搜索索引最后更新
+            check_templates()
+            store = get_article_store()
+            store.write_manifest(manifest)
+            update_homepage(new_articles, articles, pool)
+            update_archives(new_articles, articles, pool)
+            update_tags(store, manifest, changed_tags(old_sources, manifest['sources'], changes), pool=pool)
+            update_rss(store)
+            pages_elapsed = (time.perf_counter() - started) * 1000
+            update_search_index(new_articles)
+            elapsed = (time.perf_counter() - started) * 1000
+            
+            save_manifest(manifest)
+            articles = new_articles
+            print(write_summary())
+            print(f"⚡ 页面重建用时 {pages_elapsed:.0f}ms，含搜索索引共 {elapsed:.0f}ms")
+    except KeyboardInterrupt:
+        print("\n👋 停止监视")
+    finally:
+        pool.close()
+
+def build_site(articles, manifest, jobs=1, changes=None):
+    """全量更新所有页面并输出结果"""
     # 显示文章信息
     print("\n📋 文章信息 (按时间排序，最新的在前):")
     for i, article in enumerate(articles, 1):
@@ -477,11 +919,14 @@ def main():
         print()
     
     # 更新各个页面
-    update_homepage(articles)
-    update_archives(articles)
-    update_tags(articles)
-    update_rss(articles)
+    update_site(articles, manifest, jobs, changes)
+    
+    # 页面全部更新成功后再保存清单，中途失败时下次会重新构建
+    with profile_phase('save_manifest'):
+        save_manifest(manifest)
     
+    print(get_render_cache().summary())
+    print(write_summary())
     print("=" * 50)
     print("🎉 博客更新完成！")
     print("\n📋 更新内容：")
@@ -489,10 +934,259 @@ def main():
     print("- ✅ 归档页面")
     print("- ✅ 标签页面")
     print("- ✅ RSS订阅源")
+    print("- ✅ 文章清单 posts.json")
+    print("- ✅ 搜索索引")
     print("\n💡 使用提示：")
     print("1. 添加新文章后运行此脚本")
     print("2. 脚本会自动更新所有相关页面")
     print("3. 提交更改并推送到GitHub即可")
 
+def iter_batches(iterable, size):
+    """把可迭代对象依次切成不超过 size 个元素的列表"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def page_count(total, page_size):
+    """total 篇文章分页后的页数（至少一页）"""
+    return max(1, -(-total // page_size))
+
+# 与 tag_fingerprint 中 json.dumps(..., ensure_ascii=False) 的输出相同，复用同一个编码器
+_encode_member = json.JSONEncoder(ensure_ascii=False).encode
+
+def fingerprinted(tag_articles, digest):
+    """逐篇产出文章，同时把成员信息计入 digest（结果与 tag_fingerprint 相同）"""
+    digest.update(b'[')
+    for i, article in enumerate(tag_articles):
+        if i:
+            digest.update(b', ')
+        digest.update(_encode_member(tag_member(article)).encode('utf-8'))
+        yield article
+    digest.update(b']')
+
+def stream_articles(store, counts, jobs=1, full=False):
+    """流式扫描文章：逐批检查源文件、解析有变化的文件、预渲染 Markdown 文章并写入元数据库（不提交），
+    按发现顺序产出 (文章信息, 源文件的内容哈希)
+
+    内存中只保留当前一批源文件；counts 中累计 added / modified / deleted 的数量。
+    full 为 True 时忽略数据库中的记录，重新解析所有文章。
+    """
+    post_dir = Path("post")
+    for key in ('added', 'modified', 'deleted'):
+        counts.setdefault(key, 0)
+    if not post_dir.exists():
+        print("❌ post 目录不存在")
+        return
+    
+    store.begin_sweep()
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        for sources in iter_batches(iter_sources(post_dir), STREAM_BATCH_SIZE):
+            keys = [str(source[1]) for source in sources]
+            cached_sources = {} if full else store.load_entries(keys)
+            changes = {'added': [], 'modified': []}
+            new_sources = refresh_sources(sources, keys, cached_sources, changes, jobs, executor)
+            update_post_pages({'sources': new_sources}, changes)
+            store.update_entries(new_sources, cached_sources)
+            store.mark_seen(keys)
+            for kind, changed in changes.items():
+                counts[kind] += len(changed)
+            for key in keys:
+                entry = new_sources[key]
+                if entry['info']:
+                    yield entry['info'], entry['hash']
+        deleted = store.sweep_unseen()
+        for key in deleted:
+            if is_markdown_source(key):
+                remove_post_page(key)
+        counts['deleted'] += len(deleted)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def stream_site(store, jobs=1, full=False):
+    """流式构建（--stream）：文章逐篇流过，内存占用不随文章数增长
+
+    首页第 1 页和 RSS 只保留最新的几篇（堆）；首页其余分页、归档和标签页从磁盘上的外部排序结果
+    逐页生成，标签页分段写入。返回是否更新了页面。
+    """
+    has_previous_build = store.count() > 0 and not full
+    counts = {}
+    latest = TopK(max(HOMEPAGE_PAGE_SIZE, RSS_SIZE))
+    sort_dir = CACHE_DIR / "sort"
+    with ExternalSorter(sort_dir) as articles, ExternalSorter(sort_dir) as tagged:
+        with profile_phase('stream_scan'):
+            for index, (article, digest) in enumerate(stream_articles(store, counts, jobs, full)):
+                # 与 scan_articles 的排序一致：日期、slug 倒序，两者相同时按发现顺序
+                key = (article['date'], article['slug'], -index)
+                latest.push(key, article)
+                record = article.to_dict()
+                record['hash'] = digest
+                articles.add(key, record)
+                member = {field: article[field] for field in ('path', 'title', 'date', 'abstract')}
+                for tag in dict.fromkeys(article['tags']):
+                    tagged.add((tag,) + key, member)
+        
+        total = articles.count
+        if not total:
+            print("❌ 没有找到任何文章")
+            return False
+        print(f"📖 找到 {total} 篇文章")
+        print(f"🔍 新增 {counts['added']} 篇，修改 {counts['modified']} 篇，删除 {counts['deleted']} 篇")
+        if has_previous_build and not any(counts.values()):
+            # 文章没有变化，但 posts.json 可能还不存在或缺少内容哈希（内容未变化时不会重写）
+            write_posts_manifest(articles.values(), {})
+            store.commit()
+            print("✨ 没有检测到文章变化，跳过页面更新（使用 --full 强制全量构建）")
+            return False
+        
+        check_templates()
+        homepage = load_homepage_template()
+        archives = load_archives_template()
+        home_pages = page_count(total, HOMEPAGE_PAGE_SIZE)
+        archive_pages = page_count(total, ARCHIVE_PAGE_SIZE)
+        
+        # 首页第 1 页和 RSS 只需要最新的几篇，不必等排序结果
+        with profile_phase('stream_homepage_rss'):
+            top = latest.values()
+            print("📝 更新首页...")
+            write_page('.', 1, render_homepage_page(homepage, top[:HOMEPAGE_PAGE_SIZE], 1, home_pages))
+            print("📡 更新RSS文件...")
+            write_text('atom.xml', render_rss(top[:RSS_SIZE]))
+        
+        with profile_phase('stream_pages'):
+            pages = iter_batches(articles.values(), HOMEPAGE_PAGE_SIZE)
+            next(pages)  # 第 1 页已经生成
+            for number, page_articles in enumerate(pages, 2):
+                write_page('.', number, render_homepage_page(homepage, page_articles, number, home_pages))
+            remove_stale_pages('.', home_pages)
+            print(f"✅ 首页更新完成（共 {home_pages} 页，生成 {home_pages} 页）")
+            print("📚 更新归档页面...")
+            pages = iter_batches(articles.values(), ARCHIVE_PAGE_SIZE)
+            for number, page_articles in enumerate(pages, 1):
+                write_page('archives', number, render_archives_page(archives, page_articles, number, archive_pages))
+            remove_stale_pages('archives', archive_pages)
+            print(f"✅ 归档页面更新完成（共 {archive_pages} 页，生成 {archive_pages} 页）")
+        
+        # 标签页：按标签分组的排序结果逐组分段写入，同时计算指纹（供普通构建增量判断）
+        with profile_phase('stream_tags'):
+            print("🏷️ 更新标签页面...")
+            previous = store.tag_fingerprints()
+            fingerprints = {}
+            for tag, group in itertools.groupby(tagged, key=lambda record: record[0][0]):
+                digest = hashlib.sha256()
+                create_tag_page(tag, fingerprinted((member for _, member in group), digest))
+                fingerprints[tag] = digest.hexdigest()
+            write_tags_index(fingerprints)
+            removed = remove_vanished_tag_pages(previous, fingerprints)
+            store.replace_tag_fingerprints(fingerprints)
+            print(f"✅ 标签页面更新完成（重新生成 {len(fingerprints)}/{len(fingerprints)} 个标签页"
+                  f"{f'，删除 {removed} 个' if removed else ''}）")
+        
+        with profile_phase('update_posts_manifest'):
+            write_posts_manifest(articles.values(), {})
+        with profile_phase('update_search_index'):
+            update_search_index(articles.values(), spill_dir=sort_dir)
+    
+    # 页面全部更新成功后再提交，中途失败时下次会重新构建
+    with profile_phase('save_manifest'):
+        store.commit()
+    return True
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="扫描文章并更新首页、归档、标签、RSS等页面")
+    parser.add_argument('--full', action='store_true',
+                        help="忽略构建清单，重新解析所有文章并重写所有页面")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="并行解析文章和生成页面的进程数（默认：CPU 核数，1 表示串行）")
+    parser.add_argument('--stream', action='store_true',
+                        help="流式构建：不在内存中保留全部文章，适合文章数量非常多的博客（不能与 --watch 同时使用）")
+    parser.add_argument('--watch', '-w', action='store_true',
+                        help="构建完成后继续监视 post 目录，文章变化时自动更新页面")
+    parser.add_argument('--serve', type=int, nargs='?', const=8000, metavar='PORT',
+                        help="启动本地预览服务器（默认端口 8000），同时开启 --watch")
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL,
+                        help=f"watch 模式的轮询间隔秒数（默认：{WATCH_INTERVAL}）")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_FILE, type=Path, metavar='JSON_FILE',
+                        help=f"记录各阶段耗时、最慢的源文件、读写字节数和内存峰值，"
+                             f"输出表格并保存 JSON 报告（默认：{PROFILE_FILE}）")
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP_N, metavar='N',
+                        help=f"性能报告中列出最慢的 N 个源文件（默认：{DEFAULT_TOP_N}）")
+    args = parser.parse_args(argv)
+    if args.stream and (args.watch or args.serve is not None):
+        parser.error("--stream 不能与 --watch / --serve 同时使用")
+    return args
+
+def main(argv=None):
+    """主函数"""
+    args = parse_args(argv)
+    watch = args.watch or args.serve is not None
+    if args.profile:
+        start_profiling(args.profile_top)
+    print("🚀 开始更新博客...")
+    print("=" * 50)
+    
+    if args.stream:
+        updated = stream_site(get_article_store(), jobs=max(1, args.jobs), full=args.full)
+        # 没有变化时也可能补上了缺少的预渲染页面
+        print(get_render_cache().summary())
+        if updated:
+            print(write_summary())
+            print("=" * 50)
+            print("🎉 博客更新完成！")
+        if args.profile:
+            finish_profiling(args.profile)
+        return
+    
+    # 加载构建清单（--full 时从空清单开始，相当于全量构建）
+    manifest = load_manifest()
+    has_previous_build = bool(manifest['sources']) and not args.full
+    if args.full:
+        manifest['sources'] = {}
+        # 标签保留、指纹清空：所有标签页重新生成，不再有文章的标签页仍能删除
+        manifest['tags'] = dict.fromkeys(manifest['tags'], '')
+    
+    # 扫描文章
+    changes = {}
+    with profile_phase('scan_articles'):
+        articles = scan_articles(manifest, changes, jobs=max(1, args.jobs))
+    if not articles:
+        print("❌ 没有找到任何文章")
+        if args.profile:
+            finish_profiling(args.profile)
+        return
+    
+    print(f"📖 找到 {len(articles)} 篇文章")
+    print(f"🔍 新增 {len(changes['added'])} 篇，修改 {len(changes['modified'])} 篇，删除 {len(changes['deleted'])} 篇")
+    
+    if has_previous_build and not any(changes.values()):
+        # 只补上还没有预渲染的文章页面（和 posts.json 中缺少的内容哈希）
+        with profile_phase('update_post_pages'), PagePool(max(1, args.jobs)) as pool:
+            update_post_pages(manifest, changes, pool)
+        write_posts_manifest(articles, manifest['sources'])
+        save_manifest(manifest)
+        print("✨ 没有检测到文章变化，跳过页面更新（使用 --full 强制全量构建）")
+        print(get_render_cache().summary())
+    else:
+        build_site(articles, manifest, jobs=max(1, args.jobs), changes=changes)
+    
+    # 只分析首次构建，watch 模式后续的重建不计入
+    if args.profile:
+        finish_profiling(args.profile)
+    
+    if watch:
+        server = serve_preview(args.serve) if args.serve is not None else None
+        watch_site(manifest, articles, jobs=max(1, args.jobs), interval=args.interval)
+        if server:
+            server.shutdown()
+
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except MissingRegionError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)